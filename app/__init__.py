@@ -13,6 +13,28 @@ db   = SQLAlchemy()
 csrf = CSRFProtect()                     
 
 
+def engine_options(db_uri: str) -> dict:
+    """
+    Explicit pool settings for Postgres (WEB_DB_POOL_SIZE, DB_MAX_OVERFLOW,
+    DB_STATEMENT_TIMEOUT_MS) so the web app stays inside the managed
+    database's connection limit next to the pipeline (whose own pool is
+    sized by DB_POOL_SIZE, see scrapers/db_pool.py).
+    """
+    if not db_uri.startswith("postgresql"):
+        return {}                        # e.g. the in-memory SQLite of the tests
+    options = {
+        "pool_size":     int(os.getenv("WEB_DB_POOL_SIZE", 5)),
+        "max_overflow":  int(os.getenv("DB_MAX_OVERFLOW", 5)),
+        "pool_timeout":  30,
+        "pool_recycle":  1800,
+        "pool_pre_ping": True,
+    }
+    timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+    if timeout_ms:
+        options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
+
+
 def create_app() -> Flask:
     app = Flask(__name__,
                 static_folder="../static",
@@ -26,6 +48,7 @@ def create_app() -> Flask:
     app.config.update(
         SQLALCHEMY_DATABASE_URI=db_uri,
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        SQLALCHEMY_ENGINE_OPTIONS=engine_options(db_uri),
         SECRET_KEY=os.getenv("SECRET_KEY", secrets.token_hex(16)),
     )
 
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+bench_allergen_matcher.py
+-------------------------
+
+Time per ingredient of the rule-based classifier's keyword matching over
+the ingredient lines of data/evaluation_labels.csv (raw and normalised):
+
+* ``per-keyword`` – the original loop: every regex from
+                    ``compile_dictionary`` searched for every allergen
+* ``fused``       – ``AllergenMatcher``: the whole dictionary in one pattern
+* ``+ guard``     – each of the above with the false-positive guard: a
+                    whole-text ``is_false_positive`` check per hit, versus
+                    the guard phrases compiled into the fused pattern
+
+The two unguarded variants must return the same allergens for every line.
+
+    python benchmarks/bench_allergen_matcher.py [rounds]
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+from scripts.classify_allergens_rule_based import AllergenMatcher, compile_dictionary  # noqa: E402
+from scripts.clean_ingredients import normalize_ingredient  # noqa: E402
+from scripts.false_positive_guard import is_false_positive, load_guard  # noqa: E402
+
+
+def load_lines():
+    with open(ROOT_DIR / "data" / "evaluation_labels.csv", newline="", encoding="utf-8") as fh:
+        raw = [line.lower() for row in csv.DictReader(fh) for line in row["ingredients"].splitlines()]
+    return raw + [normalize_ingredient(line) for line in raw]
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    raw = json.loads((ROOT_DIR / "config" / "allergen_dict.json").read_text(encoding="utf-8"))
+    lines = load_lines()
+
+    compiled = compile_dictionary(raw)
+    matcher = AllergenMatcher(raw)
+    guarded = AllergenMatcher(raw, load_guard())
+
+    def per_keyword(lower):
+        return [a for a, regexes in compiled.items() if any(r.search(lower) for r in regexes)]
+
+    def per_keyword_guarded(lower):
+        return [a for a in per_keyword(lower) if not is_false_positive(a, lower)]
+
+    variants = [("per-keyword", per_keyword), ("fused", matcher.match),
+                ("per-keyword + guard", per_keyword_guarded), ("fused + guard", guarded.match)]
+    results = {}
+    for name, func in variants:
+        func(lines[0])
+        start = time.perf_counter()
+        for _ in range(rounds):
+            out = [func(line) for line in lines]
+        results[name] = ((time.perf_counter() - start) / rounds / len(lines) * 1e6, out)
+
+    if results["fused"][1] != results["per-keyword"][1]:
+        sys.exit("[ERROR] fused matcher disagrees with the per-keyword regexes")
+
+    keywords = sum(len(v) for v in raw.values())
+    print(f"{len(lines)} ingredient lines, {keywords} keywords, {len(raw)} allergens")
+    for name, (micros, _) in results.items():
+        print(f"{name:<20} {micros:8.1f} µs/ingredient")
+    print(f"speed-up: {results['per-keyword'][0] / results['fused'][0]:.1f}x, "
+          f"with guard {results['per-keyword + guard'][0] / results['fused + guard'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
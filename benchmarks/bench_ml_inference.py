@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+bench_ml_inference.py
+---------------------
+
+Ingredients/sec and peak RSS of the ML stage's inference on synthetic
+ingredient strings (default 10k, 100k and 1M), each variant in a fresh
+process so the RSS figures do not mix:
+
+* ``legacy``  – the pickled sklearn pipeline, one ``predict_proba`` over
+                all texts, then a Python loop over every probability of the
+                dense matrix
+* ``batched`` – the pickled pipeline through ``predict_allergens``:
+                ``INFER_BATCH`` texts per call, thresholded with ``np.nonzero``
+* ``compact`` – ``predict_allergens`` on the NumPy-only export
+                (``load_model``)
+
+All must return the same allergens.  The load column is the time to
+import and load the model.  Uses the trained model in ``models/``
+(``python scripts/classify_ambiguous_ml.py --train``).
+
+    python benchmarks/bench_ml_inference.py [sizes]      # e.g. 10000,100000
+"""
+
+from __future__ import annotations
+
+import hashlib
+import multiprocessing as mp
+import random
+import resource
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+MODIFIERS = ["", "", "fresh", "chopped", "organic", "low fat", "unsalted", "toasted",
+             "finely grated", "dried", "vegan", "smoked", "frozen"]
+
+
+def synthetic_texts(n, seed=7):
+    import pandas as pd
+
+    names = pd.read_csv(ROOT_DIR / "data" / "ambiguous_train.csv")["ingredient"].astype(str).tolist()
+    rng = random.Random(seed)
+    return [
+        " ".join(filter(None, [rng.choice(MODIFIERS), rng.choice(names),
+                               rng.choice(["", "", "and " + rng.choice(names)])]))
+        for _ in range(n)
+    ]
+
+
+def legacy_predict(model, texts, threshold):
+    from scripts.false_positive_guard import is_false_positive
+
+    pipe, vocab = model
+    probs = pipe.predict_proba(texts)
+    results = []
+    for prob_vec, raw_txt in zip(probs, texts):
+        found = []
+        for idx, p in enumerate(prob_vec):
+            if p >= threshold:
+                allergen = vocab[idx]
+                if not is_false_positive(allergen, raw_txt):
+                    found.append(allergen)
+        results.append(found)
+    return results
+
+
+def run_variant(variant, n, out):
+    texts = synthetic_texts(n)
+    start = time.perf_counter()
+    if variant == "compact":
+        from scripts.classify_ambiguous_ml import load_model
+        model = load_model()
+    else:
+        import joblib
+        from scripts.classify_ambiguous_ml import MODEL_PATH
+        model = joblib.load(MODEL_PATH)
+    loaded = time.perf_counter() - start
+    from scripts.classify_ambiguous_ml import THRESHOLD, predict_allergens
+
+    predict = legacy_predict if variant == "legacy" else predict_allergens
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    result = predict(model, texts, THRESHOLD)
+    seconds = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    digest = hashlib.md5(repr(result).encode()).hexdigest()
+    out.put((loaded, seconds, rss_after, rss_after - rss_before, digest))
+
+
+def main() -> None:
+    from scripts.classify_ambiguous_ml import MODEL_PATH
+
+    if not MODEL_PATH.exists():
+        sys.exit(f"[ERR] no trained model at {MODEL_PATH}")
+    sizes = [int(s) for s in sys.argv[1].split(",")] if len(sys.argv) > 1 else [10_000, 100_000, 1_000_000]
+    ctx = mp.get_context("spawn")
+
+    print(f"{'variant':<10}{'ingredients':>12}{'load s':>8}{'seconds':>10}{'ingr/s':>12}"
+          f"{'peak RSS MB':>13}{'growth MB':>11}")
+    for n in sizes:
+        digests = set()
+        for variant in ("legacy", "batched", "compact"):
+            out = ctx.Queue()
+            proc = ctx.Process(target=run_variant, args=(variant, n, out))
+            proc.start()
+            loaded, seconds, peak, growth, digest = out.get()
+            proc.join()
+            digests.add(digest)
+            print(f"{variant:<10}{n:>12}{loaded:>8.2f}{seconds:>10.2f}{n / seconds:>12,.0f}"
+                  f"{peak / 1024:>13.0f}{growth / 1024:>11.0f}")
+        if len(digests) != 1:
+            sys.exit("[ERROR] predictions differ between variants")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+bench_normalize.py
+------------------
+
+Ingredient-line normalisation throughput on synthetic lines (default one
+million), built from quantities, units, ingredient names, parenthesised
+asides and punctuation like the scraped recipes:
+
+* ``legacy``    – the original ``normalize_ingredient``: four ``re.sub``
+                  passes per line with the patterns looked up on every call
+* ``per-line``  – the current ``normalize_ingredient`` (precompiled, fused)
+* ``batch``     – ``normalize_lines`` over the whole column
+* ``parallel``  – ``normalize_parallel`` with one worker per core
+
+Every variant's output is checked against the legacy one.
+
+    python benchmarks/bench_normalize.py [lines]
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+from scripts.clean_ingredients import (  # noqa: E402
+    normalize_ingredient, normalize_lines, normalize_parallel,
+)
+
+QUANTITIES = ["1", "2", "1/2", "3/4", "1 1/2", "200", "½", "12", ""]
+UNITS = ["cup", "cups", "tbsp", "Tbsp.", "tsp", "tablespoons", "g", "grams", "kg",
+         "oz", "ounces", "ml", "l", "litre", ""]
+NAMES = ["all-purpose flour", "unsalted butter", "large eggs", "whole milk", "sea salt",
+         "dark chocolate", "coconut milk", "soy sauce", "sesame seeds", "rolled oats",
+         "Dijon mustard", "almond flour", "shrimp", "celery stalks", "crème fraîche"]
+ASIDES = ["", "", "", " (softened)", " (about 2 oz)", " (70%)", " (or oat milk)", ", chopped",
+          ", to taste"]
+
+
+def legacy_normalize(raw_text):
+    text = raw_text.lower()
+    text = re.sub(r"\(.*?\)", " ", text)
+    text = re.sub(r"[^a-zA-Z\s]", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    units_pattern = r"\b\d+\b|\b(?:cup|cups|tbsp|tsp|tablespoon|teaspoon|gram|grams|g|kg|oz|ounce|ounces|ml|liter|litre|l)\b"
+    text = re.sub(units_pattern, "", text)
+    return text.strip()
+
+
+def synthetic_lines(n, seed=42):
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(QUANTITIES)} {rng.choice(UNITS)} {rng.choice(NAMES)}{rng.choice(ASIDES)}"
+        for _ in range(n)
+    ]
+
+
+def timed(func, lines):
+    start = time.perf_counter()
+    out = func(lines)
+    return time.perf_counter() - start, out
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    lines = synthetic_lines(n)
+    workers = os.cpu_count() or 1
+
+    variants = [
+        ("legacy", lambda ls: [legacy_normalize(x) for x in ls]),
+        ("per-line", lambda ls: [normalize_ingredient(x) for x in ls]),
+        ("batch", normalize_lines),
+        (f"parallel x{workers}", lambda ls: normalize_parallel(ls, workers)),
+    ]
+    results = {}
+    expected = None
+    for name, func in variants:
+        seconds, out = timed(func, lines)
+        if expected is None:
+            expected = out
+        elif out != expected:
+            sys.exit(f"[ERROR] {name} output differs from legacy")
+        results[name] = seconds
+
+    print(f"{n} lines".ljust(20) + f"{'seconds':>10}{'lines/s':>14}{'speed-up':>10}")
+    base = results["legacy"]
+    for name, seconds in results.items():
+        print(f"{name:<20}{seconds:>10.2f}{n / seconds:>14,.0f}{base / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
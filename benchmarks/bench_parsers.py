@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+bench_parsers.py
+----------------
+
+Parse time per page and peak memory of the recipe parser backends over the
+saved fixture pages of all six sites (tests/fixtures/sites/*.html):
+
+* ``bs4-legacy`` – the original path: a fresh html.parser soup per page and
+                   selector strings resolved from the config on every call
+* ``bs4``        – RecipeParser with precompiled soupsieve selectors
+* ``lxml``       – RecipeParser with selectors compiled to XPath
+* ``jsonld``     – RecipeParser's JSON-LD fast path, on the same pages with
+                   the recipe embedded as a schema.org ``Recipe`` block
+                   (built from the lxml result), as most recipe blogs do
+
+Every backend runs in its own child process so the peak RSS numbers do not
+bleed into each other.
+
+    python benchmarks/bench_parsers.py [rounds]
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import resource
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+SITES = ["allergicliving", "fandom", "fare", "foodista", "theallergenfreekitchen", "theprettybee"]
+
+
+def load_pages():
+    pages = []
+    for site in SITES:
+        config = json.loads((ROOT_DIR / "config" / f"{site}.json").read_text(encoding="utf-8"))
+        html = (ROOT_DIR / "tests" / "fixtures" / "sites" / f"{site}.html").read_text(encoding="utf-8")
+        pages.append((site, config, html))
+    return pages
+
+
+def legacy_parse(config, html):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.select_one(config.get("title_selector", ""))
+    ings = [i.get_text(strip=True) for i in soup.select(config.get("ingredients_selector", ""))]
+    steps = [i.get_text(strip=True) for i in soup.select(config.get("instructions_selector", ""))]
+    tags_sel = config.get("tags_selector")
+    tags = [t.get_text(strip=True) for t in soup.select(tags_sel)] if tags_sel else []
+    return title, ings, steps, tags
+
+
+def with_jsonld(config, html):
+    """The page with its own recipe embedded as application/ld+json."""
+    from scrapers.parsing import RecipeParser
+    parsed = RecipeParser(dict(config, jsonld=False), config["site_name"]).parse(html)
+    block = json.dumps({
+        "@context": "https://schema.org",
+        "@type": "Recipe",
+        "name": parsed["title"],
+        "recipeIngredient": parsed["ingredients"].splitlines(),
+        "recipeInstructions": [{"@type": "HowToStep", "text": t}
+                               for t in parsed["instructions"].splitlines()],
+        "keywords": parsed["tags"],
+    })
+    return html.replace("</head>", f'<script type="application/ld+json">{block}</script></head>', 1)
+
+
+def run_backend(backend, rounds, out):
+    from scrapers.parsing import RecipeParser
+
+    pages = load_pages()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    per_site = {}
+    for site, config, html in pages:
+        if backend == "bs4-legacy":
+            parse = lambda h, c=config: legacy_parse(c, h)  # noqa: E731
+        elif backend == "jsonld":
+            html = with_jsonld(config, html)
+            parse = RecipeParser(config, config["site_name"]).parse
+        else:
+            parse = RecipeParser(dict(config, parser=backend, jsonld=False), config["site_name"]).parse
+        parse(html)  # warm-up
+        start = time.perf_counter()
+        for _ in range(rounds):
+            parse(html)
+        per_site[site] = (time.perf_counter() - start) / rounds * 1000
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    out.put((backend, per_site, rss_after, rss_after - rss_before))
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    ctx = mp.get_context("spawn")
+    results = {}
+    for backend in ("bs4-legacy", "bs4", "lxml", "jsonld"):
+        out = ctx.Queue()
+        proc = ctx.Process(target=run_backend, args=(backend, rounds, out))
+        proc.start()
+        name, per_site, peak, growth = out.get()
+        proc.join()
+        results[name] = (per_site, peak, growth)
+
+    backends = list(results)
+    print(f"ms per page ({rounds} rounds)".ljust(26) + "".join(f"{b:>12}" for b in backends))
+    for site in SITES:
+        print(f"{site:<26}" + "".join(f"{results[b][0][site]:>12.2f}" for b in backends))
+    mean = {b: sum(results[b][0].values()) / len(SITES) for b in backends}
+    print(f"{'mean':<26}" + "".join(f"{mean[b]:>12.2f}" for b in backends))
+    print(f"{'peak RSS (MiB)':<26}" + "".join(f"{results[b][1] / 1024:>12.1f}" for b in backends))
+    print(f"{'RSS growth (MiB)':<26}" + "".join(f"{results[b][2] / 1024:>12.1f}" for b in backends))
+    print(f"lxml speed-up vs legacy: {mean['bs4-legacy'] / mean['lxml']:.1f}x")
+    print(f"JSON-LD speed-up vs lxml: {mean['lxml'] / mean['jsonld']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -30,5 +30,120 @@ CREATE TABLE IF NOT EXISTS clean_recipes (
     scraped_at   TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
+-- One clean row per (site, title): the conflict target of the batched
+-- upsert in scrapers/db_writer.py.  Databases created before this key may
+-- hold duplicates, so the newest row of each pair is kept first.
+DELETE FROM clean_recipes a
+ USING clean_recipes b
+ WHERE a.site_name = b.site_name
+   AND a.recipe_title = b.recipe_title
+   AND a.id < b.id;
+CREATE UNIQUE INDEX IF NOT EXISTS clean_recipes_site_title_key
+    ON clean_recipes (site_name, recipe_title);
 
 
+
+-- ==========================================================================
+-- TABLE 3: http_validators
+-- ETag / Last-Modified per recipe URL, sent back as If-None-Match /
+-- If-Modified-Since so unchanged pages come back as 304 and are skipped.
+-- ==========================================================================
+
+CREATE TABLE IF NOT EXISTS http_validators (
+    url           TEXT PRIMARY KEY,
+    site_name     TEXT NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    checked_at    TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS http_validators_site_idx ON http_validators (site_name);
+
+-- ==========================================================================
+-- Content digests (SHA-256 hex) – lets the scraper skip unchanged pages and
+-- downstream stages restrict work to recipes whose content changed.
+-- ==========================================================================
+
+ALTER TABLE raw_recipes   ADD COLUMN IF NOT EXISTS content_digest TEXT;
+ALTER TABLE clean_recipes ADD COLUMN IF NOT EXISTS content_digest TEXT;
+
+-- ==========================================================================
+-- TABLE 4: pipeline_progress
+-- Digest each pipeline stage last processed per recipe; a stage has work
+-- to do for a recipe when its digest differs from the upstream one.
+-- ==========================================================================
+
+CREATE TABLE IF NOT EXISTS pipeline_progress (
+    stage        TEXT    NOT NULL,
+    recipe_id    INTEGER NOT NULL REFERENCES clean_recipes(id) ON DELETE CASCADE,
+    digest       TEXT,
+    processed_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (stage, recipe_id)
+);
+
+-- ==========================================================================
+-- TABLE 5: html_dictionaries
+-- Per-site preset dictionaries for the "deflate-dict" raw HTML codec.
+-- ==========================================================================
+
+CREATE TABLE IF NOT EXISTS html_dictionaries (
+    id         SERIAL PRIMARY KEY,
+    site_name  TEXT NOT NULL,
+    data       BYTEA NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- ==========================================================================
+-- Compressed raw HTML (see scrapers/html_codec.py).  html_codec = 'plain'
+-- keeps the page in raw_html; any other codec stores it in
+-- raw_html_compressed and leaves raw_html NULL.
+-- ==========================================================================
+
+ALTER TABLE raw_recipes ALTER COLUMN raw_html DROP NOT NULL;
+ALTER TABLE raw_recipes ADD COLUMN IF NOT EXISTS raw_html_compressed BYTEA;
+ALTER TABLE raw_recipes ADD COLUMN IF NOT EXISTS html_codec TEXT NOT NULL DEFAULT 'plain';
+ALTER TABLE raw_recipes ADD COLUMN IF NOT EXISTS html_dict_id INT REFERENCES html_dictionaries(id);
+
+-- ==========================================================================
+-- Incremental crawling: when each recipe page was last fetched, and when
+-- each site last had a full pagination crawl.
+-- ==========================================================================
+
+ALTER TABLE raw_recipes ADD COLUMN IF NOT EXISTS checked_at TIMESTAMP DEFAULT NOW();
+
+CREATE TABLE IF NOT EXISTS site_crawls (
+    site_name          TEXT PRIMARY KEY,
+    last_full_crawl_at TIMESTAMP
+);
+
+-- ==========================================================================
+-- Resumable crawls: per-URL progress of the current crawl cycle (see
+-- scrapers/crawl_state.py; the scraper also creates it on first use).
+-- ==========================================================================
+
+CREATE TABLE IF NOT EXISTS crawl_state (
+    url             TEXT PRIMARY KEY,
+    site_name       TEXT NOT NULL,
+    kind            TEXT NOT NULL,
+    status          TEXT NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    next_attempt_at TIMESTAMP,
+    updated_at      TIMESTAMP NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS crawl_state_site_idx ON crawl_state (site_name, status);
+
+-- ==========================================================================
+-- Classifier answers per distinct ingredient string (see
+-- scripts/allergen_cache.py; the classification stages also create it).
+-- version is a digest of the dictionary / model that produced the answer.
+-- ==========================================================================
+
+CREATE TABLE IF NOT EXISTS allergen_cache (
+    ingredient TEXT NOT NULL,
+    classifier TEXT NOT NULL,
+    version    TEXT NOT NULL,
+    allergens  TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (classifier, version, ingredient)
+);
@@ -0,0 +1,133 @@
+"""
+async_fetch.py
+--------------
+Concurrent fetch engine used by ``BaseRecipeScraper.run`` when a site config
+sets ``"concurrency"`` above 1.
+
+The engine drives an asyncio event loop on a background thread and keeps at
+most ``concurrency`` detail pages in flight.  Each fetch is delegated to the
+scraper's own ``fetch_page`` (run in a thread pool), so the requests session,
+its urllib3 retry policy (429/5xx backoff) and the logging stay exactly the
+same as in the serial path.  Results are handed back to the caller through a
+bounded queue, which means parsing and saving still happen on the calling
+thread – the DB cursor is never shared between threads.  If the URL iterable
+itself raises, the fetches already in flight are finished and handed over
+first, then the exception is re-raised to the caller, as in the serial path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+_DONE = object()
+
+
+class _Failed:
+    """End-of-results marker carrying the exception that stopped the engine."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class AsyncFetchEngine:
+    """
+    Fetch many URLs concurrently with a bounded number of requests in flight.
+
+    :param fetch:       callable ``url -> html`` (usually ``scraper.fetch_page``)
+    :param concurrency: maximum number of simultaneous fetches
+    :param logger:      optional logger for engine-level messages
+    """
+
+    def __init__(self, fetch: Callable[[str], str], concurrency: int = 8, logger=None):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.fetch = fetch
+        self.concurrency = concurrency
+        self.logger = logger
+
+    # ------------------------------------------------------------------ #
+    def iter_pages(
+        self, urls: Iterable[str]
+    ) -> Iterator[tuple[str, Optional[str], Optional[Exception]]]:
+        """
+        Yield ``(url, html, error)`` tuples in completion order.
+
+        Exactly one of ``html`` / ``error`` is set for every URL.  ``urls`` is
+        consumed lazily, so it may be a generator that is still discovering
+        links while earlier pages are being fetched.  An exception raised by
+        ``urls`` is re-raised here once the pages in flight have been yielded.
+        """
+        out: queue.Queue = queue.Queue(maxsize=self.concurrency * 2)
+        worker = threading.Thread(
+            target=self._run_loop, args=(urls, out), name="async-fetch", daemon=True
+        )
+        worker.start()
+        while True:
+            item = out.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failed):
+                worker.join()
+                raise item.error
+            yield item
+        worker.join()
+
+    # ------------------------------------------------------------------ #
+    def _run_loop(self, urls: Iterable[str], out: queue.Queue) -> None:
+        end = _DONE
+        try:
+            asyncio.run(self._crawl(urls, out))
+        except Exception as e:
+            if self.logger:
+                self.logger.error("Async fetch engine stopped: %s", e)
+            end = _Failed(e)
+        finally:
+            out.put(end)
+
+    async def _crawl(self, urls: Iterable[str], out: queue.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+        pending: set[asyncio.Task] = set()
+        url_iter = iter(urls)
+
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="fetch"
+        ) as pool:
+
+            async def fetch_one(url: str) -> None:
+                try:
+                    html = await loop.run_in_executor(pool, self.fetch, url)
+                    result = (url, html, None)
+                except Exception as e:
+                    result = (url, None, e)
+                try:
+                    # Blocks while the consumer is busy → natural backpressure.
+                    await loop.run_in_executor(None, out.put, result)
+                finally:
+                    slots.release()
+
+            error = None
+            while True:
+                await slots.acquire()
+                try:
+                    url = await loop.run_in_executor(None, next, url_iter, _DONE)
+                except Exception as e:
+                    # link discovery failed: stop taking URLs, keep what is in flight
+                    slots.release()
+                    error = e
+                    break
+                if url is _DONE:
+                    slots.release()
+                    break
+                task = asyncio.create_task(fetch_one(url))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            if pending:
+                await asyncio.gather(*pending)
+            if error is not None:
+                raise error
@@ -1,27 +1,52 @@
 import os
+import sys
 import time
 import json
+import hashlib
 import logging
+import threading
+from datetime import datetime, timedelta
+from functools import partial
 import requests
-import psycopg2
-from bs4 import BeautifulSoup
 
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from urllib.parse import urljoin
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from pathlib import Path         
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+from scrapers.async_fetch import AsyncFetchEngine
+from scrapers.politeness import HostScheduler, PoliteRetry
+from scrapers.db_writer import PendingRecipe, RecipeWriter, write_batch
+from scrapers.parsing import RecipeParser
+from scrapers.pipeline import ParsePool, resolve_workers
+from scrapers.html_codec import DEFLATE_DICT, PLAIN, decode_html
+from scrapers.frontier import CrawlFrontier, normalize_url
+from scrapers.browser_pool import BrowserPool
+from scrapers.crawl_state import CrawlState, DONE, FAILED, RECIPE
+from scrapers import db_pool
 
 LOG_DIR  = ROOT_DIR / "logs"
 LOG_DIR.mkdir(exist_ok=True) 
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
+
+def html_digest(raw_html):
+    """SHA-256 hex digest of the page HTML."""
+    return hashlib.sha256(raw_html.encode("utf-8")).hexdigest()
+
+
+def recipe_digest(parsed_data):
+    """SHA-256 hex digest of the parsed fields that end up in clean_recipes."""
+    fields = ("title", "ingredients", "instructions", "tags")
+    joined = "\x1f".join(parsed_data.get(f) or "" for f in fields)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
 class BaseRecipeScraper:
     """
     A base class to handle the common workflow of scraping recipe sites:
@@ -43,33 +68,92 @@ class BaseRecipeScraper:
             - instructions_selector (str)
             - tags_selector (str)
             - use_selenium (bool)
+            - browser_pool_size (int)           # (Optional) use_selenium: browsers kept for reuse, default 2
+            - browser_wait (float)              # (Optional) use_selenium: seconds to wait for the selector, default 10
+            - concurrency (int)                 # (Optional) Parallel detail fetches, default 1
+            - rate_limit (dict)                 # (Optional) {"requests_per_second", "burst"} per host
+            - conditional_get (bool)            # (Optional) Revalidate detail pages with ETag/Last-Modified, default true
+            - batch_size (int)                  # (Optional) Recipes per DB commit during run(), default 50
+            - parser (str)                      # (Optional) "lxml" (default) or "bs4"
+            - parse_workers (int | "auto")      # (Optional) Parser processes, default 0 = inline ("auto" for reparse())
+            - html_codec (str)                  # (Optional) raw_html storage: "plain" (default), "gzip", "deflate-dict", "zstd"
+            - incremental (bool)                # (Optional) Stop pagination at known recipes and skip recently checked ones, default false
+            - full_crawl_days (int)             # (Optional) Incremental mode: crawl everything when the last full crawl is older, default 7
+            - refresh_days (int)                # (Optional) Incremental mode: refetch a known recipe after this many days, default 14
+            - resume (bool)                     # (Optional) Keep per-URL progress in crawl_state and resume interrupted runs, default true
+            - time_budget (float)               # (Optional) Seconds after which run() stops taking new links (resumed next run)
+            - max_attempts (int)                # (Optional) Failed URLs are retried with backoff up to this many times, default 5
+            - retry_after (float)               # (Optional) Seconds before the first retry of a failed URL, default 300
             
         """
 
         self.config = config
         self.site_name = config.get("site_name", "UnknownSite")
         self.start_urls = config.get("start_urls", [])
-
-        # Logging setup
+        self.concurrency = max(1, int(config.get("concurrency") or 1))
+        self.conditional_get = config.get("conditional_get", True)
+        self.parser = RecipeParser(config, self.site_name)
+        self.parse_workers = resolve_workers(config.get("parse_workers"))
+
+        # HTTP validators: stored ones (loaded at run start) and the ones
+        # received this run, persisted together with the recipe in save_recipe.
+        self._validators = {}
+        self._fresh_validators = {}
+        self.not_modified = 0
+
+        # url -> (raw_id, raw digest, clean digest) of recipes already stored
+        # (normalised URLs), and when each was last fetched
+        self._known = {}
+        self._checked_at = {}
+        self.unchanged = 0
+
+        # Incremental crawl: decided per run() from site_crawls
+        self.incremental = config.get("incremental", False)
+        self.full_crawl_days = float(config.get("full_crawl_days", 7))
+        self.refresh_after = timedelta(days=float(config.get("refresh_days", 14)))
+        self.full_crawl = True
+        self.skipped_fresh = 0
+
+        # Durable crawl progress, only active while run() is in progress
+        self.resume = config.get("resume", True)
+        self.time_budget = config.get("time_budget")
+        self.crawl_state = None
+        self.budget_exhausted = False
+
+        # Batched writer, only active while run() is in progress
+        self.batch_size = max(1, int(config.get("batch_size") or 50))
+        self.writer = None
+
+        # Raw HTML storage codec; "deflate-dict" uses the site's latest
+        # html_dictionaries row, loaded on first write
+        self.html_codec = config.get("html_codec") or PLAIN
+        self.html_dictionary = None
+        self._html_dictionary_loaded = False
+        self._dictionaries = {}
+
+        # Logging setup – a file handler per site logger (not basicConfig),
+        # so several scrapers in one process each keep their own log file
         
         log_filename = LOG_DIR / f"{self.site_name.lower().replace(' ', '_')}.log"
-        logging.basicConfig(
-            filename=str(log_filename),    
-            filemode="a",
-            format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-            level=logging.INFO,
-        )
         self.logger = logging.getLogger(self.site_name)
-
-        # Database connection (
+        self.logger.setLevel(logging.INFO)
+        if not any(getattr(h, "baseFilename", None) == os.path.abspath(log_filename)
+                   for h in self.logger.handlers):
+            handler = logging.FileHandler(str(log_filename), mode="a", encoding="utf-8")
+            handler.setFormatter(logging.Formatter(
+                "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+            ))
+            self.logger.addHandler(handler)
+
+        # Database connection, borrowed from the shared pool (see db_pool.py)
         try:
             db_url = os.getenv("DATABASE_URL", "")
             if db_url.lower().startswith("postgres"):
                 # Render 
-                self.db_connection = psycopg2.connect(db_url, sslmode="require")
+                self.db_connection = db_pool.connect(db_url, sslmode="require")
             else:
                 # Local default 
-                self.db_connection = psycopg2.connect(
+                self.db_connection = db_pool.connect(
                     dbname=os.getenv("PGDATABASE", "allergen_recipes"),
                     user=os.getenv("PGUSER",     "postgres"),
                     password=os.getenv("PGPASSWORD", "admin"),
@@ -83,232 +167,651 @@ class BaseRecipeScraper:
             self.logger.error("Failed to connect to the database: %s", e)
             raise  # Stop execution if DB connection fails
 
-        # Selenium or Requests?
+        # Per-host politeness, shared by listing and detail fetches
+        self.scheduler = HostScheduler.from_config(
+            config, robots_fetch=self._fetch_robots, logger=self.logger
+        )
+
+        # Selenium or Requests?  use_selenium sites still try plain HTTP
+        # first and only render pages in a (lazily started) browser when the
+        # static HTML lacks the content.
         self.use_selenium = config.get("use_selenium", False)
+        self.plain_fetches = 0
+        self.browser_fetches = 0
+        self._fetch_stats_lock = threading.Lock()
 
         if self.use_selenium:
-            # Configure headless Chrome for dynamic rendering
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            self.driver = webdriver.Chrome(options=chrome_options)
-        else:
-            # Requests Session with retry strategy
-            self.session = requests.Session()
-            retries = Retry(
-                total=3, 
-                backoff_factor=2,
-                status_forcelist=[429, 500, 502, 503, 504]
+            self.browser_wait = float(config.get("browser_wait", 10))
+            self.browser_pool = BrowserPool(
+                size=int(config.get("browser_pool_size") or 2),
+                logger=self.logger,
+                healthy_errors=(TimeoutException,),
             )
-            adapter = HTTPAdapter(max_retries=retries)
-            self.session.mount("http://", adapter)
-            self.session.mount("https://", adapter)
+
+        # Requests Session with retry strategy
+        self.session = requests.Session()
+        retries = PoliteRetry(
+            total=3, 
+            backoff_factor=2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            scheduler=self.scheduler,
+        )
+        adapter = HTTPAdapter(
+            max_retries=retries,
+            pool_maxsize=max(10, self.concurrency),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
         self.logger.info("Initialized scraper for site: %s", self.site_name)
 
                     
-    def fetch_page(self, url):
+    def _fetch_robots(self, robots_url):
+        """Return robots.txt text (or None) – used once per host by the scheduler."""
+        response = requests.get(robots_url, headers={"User-Agent": USER_AGENT}, timeout=10)
+        return response.text if response.status_code == 200 else None
+
+    def fetch_page(self, url, conditional=False, wait_for="title_selector"):
+        """
+        Return the page HTML.  With ``conditional=True`` the stored ETag /
+        Last-Modified validators are sent and ``None`` is returned on a 304.
+
+        For ``use_selenium`` sites the page is fetched over plain HTTP first
+        and only rendered in a pooled browser when the ``wait_for`` selector
+        (a config key) finds nothing in the static HTML.
+        """
         self.logger.info("Fetching URL: %s", url)
+        if not self.use_selenium:
+            return self._fetch_http(url, conditional)
+        try:
+            html = self._fetch_http(url)
+        except Exception:
+            html = None
+        if html is not None and self.parser.matches(html, wait_for):
+            self._count_fetch(browser=False)
+            return html
+        return self._fetch_browser(url, self.config.get(wait_for))
+
+    def _count_fetch(self, browser):
+        with self._fetch_stats_lock:
+            if browser:
+                self.browser_fetches += 1
+            else:
+                self.plain_fetches += 1
+
+    def _fetch_http(self, url, conditional=False):
         headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
+            "User-Agent": USER_AGENT
         }
-        if self.use_selenium:
-            for attempt in range(3):
-                try:
-                    self.driver.get(url)
-                    title_sel = self.config.get("title_selector")
-                    if title_sel:
-                        WebDriverWait(self.driver, 10).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, title_sel))
-                        )
-                    html = self.driver.page_source
-                    return html
-                except Exception as e:
-                    self.logger.error("Selenium attempt %d failed for %s: %s", attempt+1, url, e)
-                    if attempt < 2:
-                        time.sleep(2)
-                    else:
-                        raise
-        else:
+        if conditional and self.conditional_get:
+            etag, last_modified = self._validators.get(url, (None, None))
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        try:
+            self.scheduler.wait(url)
+            response = self.session.get(url, headers=headers, timeout=10)
+            if response.status_code == 304:
+                self.logger.info("Not modified: %s", url)
+                return None
+            response.raise_for_status()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if (etag or last_modified) and not self.use_selenium:
+                self._fresh_validators[url] = (etag, last_modified)
+            return response.text
+        except Exception as e:
+            self.logger.error("Requests failed to load: %s | Error: %s", url, e)
+            raise e
+
+    def _fetch_browser(self, url, selector):
+        for attempt in range(3):
             try:
-                response = self.session.get(url, headers=headers, timeout=10)
-                response.raise_for_status()
-                return response.text
+                self.scheduler.wait(url)
+                with self.browser_pool.browser() as driver:
+                    driver.get(url)
+                    if selector:
+                        WebDriverWait(driver, self.browser_wait).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                        )
+                    html = driver.page_source
+                self._count_fetch(browser=True)
+                return html
             except Exception as e:
-                self.logger.error("Requests failed to load: %s | Error: %s", url, e)
-                raise e
-
+                self.logger.error("Selenium attempt %d failed for %s: %s", attempt+1, url, e)
+                if attempt < 2:
+                    time.sleep(0.5 * (attempt + 1))
+                else:
+                    raise
 
     def parse_recipe(self, html):
         """
-        Parse out the relevant recipe details from the HTML using Beautiful Soup.
+        Parse out the relevant recipe details from the HTML (lxml with
+        precompiled selectors, falling back to Beautiful Soup).
         Returns a dict with keys: 'title', 'ingredients', 'instructions', 'tags', etc.
         """
-        soup = BeautifulSoup(html, "html.parser")
-
-        # Title
-        title_sel = self.config.get("title_selector", "")
-        title_elem = soup.select_one(title_sel)
-        title_text = title_elem.get_text(strip=True) if title_elem else "Untitled"
-
-        # Ingredients
-        ingredients_sel = self.config.get("ingredients_selector", "")
-        ingredients_elems = soup.select(ingredients_sel)
-        ingredients_list = [i.get_text(strip=True) for i in ingredients_elems]
-
-        # Instructions
-        instructions_sel = self.config.get("instructions_selector", "")
-        instructions_elems = soup.select(instructions_sel)
-        instructions_list = [i.get_text(strip=True) for i in instructions_elems]
-
-        # Tags
-        tags_sel = self.config.get("tags_selector", "")
-        if tags_sel:
-            tags_elems = soup.select(tags_sel)
-            tags_list = [t.get_text(strip=True) for t in tags_elems]
-        else:
-            tags_list = []
-
-        # Build final dictionary
-        data = {
-            "site_name": self.site_name,
-            "title": title_text,
-            "ingredients": "\n".join(ingredients_list),
-            "instructions": "\n".join(instructions_list),
-            "tags": ", ".join(tags_list),
-        }
-        return data
+        return self.parser.parse(html)
+
+    def _prepare_recipe(self, url, raw_html, parsed_data):
+        """
+        Digest a parsed page and decide what needs writing.  Returns a
+        PendingRecipe, or None when HTML and parsed fields are both unchanged
+        since the last run (only fresh HTTP validators, if any, need saving).
+        """
+        raw_digest = html_digest(raw_html)
+        clean_digest = recipe_digest(parsed_data)
+        raw_id, known_raw, known_clean = self._known.get(url, (None, None, None))
+        if raw_id and known_raw == raw_digest and known_clean == clean_digest:
+            self.unchanged += 1
+            self.logger.info("Unchanged recipe: '%s' (URL: %s)", parsed_data["title"], url)
+            return None
+        return PendingRecipe(
+            url=url,
+            raw_html=raw_html,
+            parsed=parsed_data,
+            raw_digest=raw_digest,
+            clean_digest=clean_digest,
+            raw_id=raw_id if known_raw == raw_digest else None,
+            validators=self._fresh_validators.pop(url, None),
+        )
+
+    def _url_committed(self, url):
+        self._mark(url, DONE)
+
+    def _url_failed(self, url, error):
+        self._mark(url, FAILED, error)
+
+    def _recipe_saved(self, recipe):
+        self._known[recipe.url] = (recipe.raw_id, recipe.raw_digest, recipe.clean_digest)
+        self.logger.info("Saved recipe: '%s' (URL: %s)", recipe.parsed["title"], recipe.url)
 
     def save_recipe(self, url, raw_html, parsed_data):
         """
         Insert the raw HTML into raw_recipes,
         then insert the cleaned recipe data into clean_recipes.
+
+        Both rows carry a content digest; a page whose HTML and parsed fields
+        are unchanged since the last run is not rewritten at all.
         """
+        recipe = self._prepare_recipe(url, raw_html, parsed_data)
+        fresh = self._fresh_validators.pop(url, None)
+        checked = [url] if self._stored_unchanged(url, recipe) else []
+        if recipe is None and not fresh and not checked:
+            return
         try:
-            # Insert into raw_recipes (check for duplicate URL)
-            insert_raw = """
-                INSERT INTO raw_recipes (site_name, url, raw_html)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (url) DO NOTHING
-                RETURNING id;
-            """
-            self.db_cursor.execute(insert_raw, (self.site_name, url, raw_html))
-            raw_id = self.db_cursor.fetchone()
-
-            if not raw_id:
-                # Retrieve existing ID for linking in clean_recipes
-                self.db_cursor.execute("SELECT id FROM raw_recipes WHERE url = %s;", (url,))
-                existing = self.db_cursor.fetchone()
-                raw_id = existing if existing else (None,)
-            raw_id = raw_id[0]  # raw_id is a tuple
-
-            # Insert into clean_recipes
-            insert_clean = """
-                INSERT INTO clean_recipes
-                (raw_id, site_name, recipe_title, ingredients, instructions, tags, scraped_at)
-                VALUES (%s, %s, %s, %s, %s, %s, NOW())
-                ON CONFLICT (site_name, recipe_title)                       
-                DO UPDATE
-                   SET raw_id       = EXCLUDED.raw_id,
-					   ingredients  = EXCLUDED.ingredients,
-                       instructions = EXCLUDED.instructions,
-                       tags         = EXCLUDED.tags,
-                       scraped_at   = NOW();
-            """
-            self.db_cursor.execute(
-                insert_clean,
-                (
-                    raw_id,
-                    parsed_data["site_name"],
-                    parsed_data["title"],
-                    parsed_data["ingredients"],
-                    parsed_data["instructions"],
-                    parsed_data["tags"],
-                )
+            write_batch(
+                self.db_cursor,
+                self.site_name,
+                [recipe] if recipe else [],
+                [(url, fresh)] if fresh else [],
+                codec=self.html_codec,
+                dictionary=self.load_html_dictionary(),
+                checked=checked,
             )
-
             self.db_connection.commit()
-            self.logger.info("Saved recipe: '%s' (URL: %s)", parsed_data["title"], url)
+            if recipe:
+                self._recipe_saved(recipe)
         except Exception as e:
             self.db_connection.rollback()
             self.logger.error("Database error saving recipe from %s: %s", url, e) 
 
+    def queue_recipe(self, url, raw_html, parsed_data):
+        """
+        Like save_recipe, but hands the recipe to the batched writer of the
+        current run; it is committed together with the rest of its batch.
+        """
+        if self.writer is None:
+            return self.save_recipe(url, raw_html, parsed_data)
+        recipe = self._prepare_recipe(url, raw_html, parsed_data)
+        queued = False
+        if self._stored_unchanged(url, recipe):
+            self.writer.add_checked(url)
+            queued = True
+        if recipe is not None:
+            self.writer.add(recipe)
+            queued = True
+        else:
+            fresh = self._fresh_validators.pop(url, None)
+            if fresh:
+                self.writer.add_validators(url, fresh)
+                queued = True
+        if not queued:
+            # nothing to write – done now; otherwise once the writer commits
+            self._mark(url, DONE)
+
+    def _stored_unchanged(self, url, recipe):
+        """
+        Incremental mode: True when the stored raw row is current, so only its
+        checked_at needs bumping (the refresh interval counts from there).
+        """
+        return (self.incremental and url in self._known
+                and (recipe is None or recipe.raw_id is not None))
+
+    def iter_recipe_links(self, plan=None):
+        """
+        Yield recipe links as the listing pages are crawled: all
+        'start_urls' pagination chains are followed concurrently and every
+        link is normalised and yielded once, as soon as it is discovered.
+
+        With a CrawlPlan (resumable runs) the plan's recipe URLs come first
+        and the crawl starts from its listing pages, skipping what the
+        current cycle already finished.
+        """
+        base_url = self.config.get("base_url", self.start_urls[0])
+        state = self.crawl_state
+        frontier = CrawlFrontier(
+            partial(self.fetch_page, wait_for="recipe_link_selector"),
+            lambda page_html: self.parser.extract_links(page_html, base_url),
+            concurrency=self.concurrency,
+            logger=self.logger,
+            follow_next=None if self.full_crawl else self._has_unknown_links,
+            on_page=state.page_crawled if state else None,
+            on_error=state.page_failed if state else None,
+            done_pages=plan.done_pages if plan else (),
+            done_links=plan.done_links if plan else (),
+        )
+        if plan:
+            yield from plan.recipe_urls
+        yield from frontier.iter_links(plan.listing_urls if plan else self.start_urls)
+        self.logger.info("Found %d unique recipe links on %d listing pages for site '%s'.",
+                         len(frontier.seen_links), frontier.pages_crawled, self.site_name)
+        if frontier.chains_stopped:
+            self.logger.info("Incremental crawl stopped %d pagination chains at known recipes",
+                             frontier.chains_stopped)
+
+    def _has_unknown_links(self, links):
+        """Follow pagination past a listing page unless all of its recipes are stored."""
+        return not links or any(link not in self._known for link in links)
+
+    def _links_due(self, links):
+        """
+        Drop known recipes fetched within the refresh interval (incremental
+        runs only); everything else goes on to the detail fetch.
+        """
+        if self.full_crawl:
+            yield from links
+            return
+        now = datetime.now()
+        for link in links:
+            checked_at = self._checked_at.get(link)
+            if link in self._known and checked_at and now - checked_at < self.refresh_after:
+                self.skipped_fresh += 1
+                self._mark(link, DONE)
+                continue
+            yield link
+
+    def _within_budget(self, links, deadline):
+        """Stop taking new links once ``deadline`` (monotonic) has passed."""
+        try:
+            for link in links:
+                if deadline is not None and time.monotonic() > deadline:
+                    self.budget_exhausted = True
+                    self.logger.info("Time budget used up – the rest is left for the next run")
+                    return
+                yield link
+        finally:
+            close = getattr(links, "close", None)
+            if close:
+                close()
+
+    def _mark(self, url, status, error=None):
+        if self.crawl_state is not None:
+            self.crawl_state.mark(url, RECIPE, status, error)
+
     def gather_recipe_links(self):
         """
         Collect recipe links by crawling the 'start_urls' and following pagination if configured.
         Returns a list of unique URLs.
         """
-        all_links = []
-        link_sel = self.config.get("recipe_link_selector", "")
-        pag_sel = self.config.get("pagination_selector", "")
-        visited_pages = set()
-        
-        base_url = self.config.get("base_url", self.start_urls[0])
+        return list(self.iter_recipe_links())
 
-        def fetch_and_extract(url):
-            """Local helper function to fetch a page, gather recipe links, find 'next' link."""
-            try:
-                page_html = self.fetch_page(url)
-            except Exception as err:
-                self.logger.error("Failed to fetch page %s: %s", url, err)
-                return None, None
-
-            soup = BeautifulSoup(page_html, "html.parser")
-            # Extract recipe detail links
-            #recipe_links = [a.get("href") for a in soup.select(link_sel) if a.get("href")]
-            
-            recipe_links = []
-            for a in soup.select(link_sel):
-                href = a.get("href")
-                if href:
-                    absolute_href = urljoin(base_url, href)
-                    recipe_links.append(absolute_href)
-            
-            # Extract next-page link if any
-            next_elem = soup.select_one(pag_sel) if pag_sel else None
-            next_url = next_elem.get("href") if next_elem else None
-#
-            if next_url:
-                next_url = urljoin(base_url, next_url)
-
-            return recipe_links, next_url
-
-        # Loop over each start URL
-        for start_url in self.start_urls:
-            current_url = start_url
-            while current_url and current_url not in visited_pages:
-                visited_pages.add(current_url)
-                recipe_links, next_url = fetch_and_extract(current_url)
-                if recipe_links:
-                    all_links.extend(recipe_links)
-                current_url = next_url
-
-        unique_links = list(set(all_links))
-        self.logger.info("Found %d unique recipe links for site '%s'.",
-                         len(unique_links), self.site_name)
-        return unique_links
-
-    def run(self):
+    def run(self, full_crawl=None, time_budget=None):
         """
         Main entry point:
-          1. Gather all recipe links (including pagination).
-          2. For each link, fetch, parse, and save data to the DB.
+          1. Crawl the listing pages (including pagination).  In incremental
+             mode a pagination chain ends at a page with only known recipes
+             and recently checked recipes are not refetched, unless a full
+             crawl is due (every ``full_crawl_days``) or ``full_crawl=True``.
+          2. Stream every recipe link, as soon as it is discovered, through
+             fetch → parse → the batched DB writer (committed every
+             ``batch_size`` recipes).
           3. If Selenium is in use, close the browser at the end.
+
+        Progress is kept per URL in crawl_state: a run that dies, or stops
+        after ``time_budget`` seconds, is resumed by the next one, and
+        failed URLs are retried with backoff on later runs.
         """
+        time_budget = time_budget if time_budget is not None else self.time_budget
+        deadline = time.monotonic() + float(time_budget) if time_budget else None
         try:
-            links = self.gather_recipe_links()
-            for link in links:
-                try:
-                    html = self.fetch_page(link)
-                    parsed = self.parse_recipe(html)
-                    self.save_recipe(link, html, parsed)
-                except Exception as e:
-                    self.logger.error("Error on link %s: %s", link, e)
-                    # Skip and continue to next link
+            self.load_validators()
+            self.load_known_digests()
+            self.full_crawl = self.full_crawl_due() if full_crawl is None else full_crawl
+            self.logger.info("Starting %s crawl",
+                             "full" if self.full_crawl else "incremental")
+            plan = None
+            if self.resume:
+                self.crawl_state = CrawlState(
+                    self.db_connection, self.site_name, logger=self.logger,
+                    retry_base=float(self.config.get("retry_after", 300)),
+                    max_attempts=int(self.config.get("max_attempts", 5)),
+                    flush_every=self.batch_size,
+                )
+                plan = self.crawl_state.start(self.start_urls)
+            links = self.iter_recipe_links(plan)
+            links = self._links_due(links)
+            links = self._within_budget(links, deadline)
+            self.writer = RecipeWriter(
+                self.db_connection,
+                self.site_name,
+                batch_size=self.batch_size,
+                logger=self.logger,
+                on_saved=self._recipe_saved,
+                on_committed=self._url_committed,
+                on_failed=self._url_failed,
+                codec=self.html_codec,
+                dictionary=self.load_html_dictionary(),
+            )
+            with self.writer:
+                pages = self.iter_fetched(links)
+                for link, html, parsed in self.iter_parsed(pages):
+                    try:
+                        self.queue_recipe(link, html, parsed)
+                    except Exception as e:
+                        self.logger.error("Error on link %s: %s", link, e)
+                        self._mark(link, FAILED, e)
+                    if self.crawl_state is not None:
+                        self.crawl_state.maybe_flush()
+            self.logger.info("Wrote %d recipes in %d batches",
+                             self.writer.rows_written, self.writer.batches)
+            if self.crawl_state is not None:
+                self.crawl_state.flush()
+            if self.incremental and self.full_crawl and self.cycle_complete():
+                self.record_full_crawl()
 
         finally:
             # Cleanup
+            self.writer = None
+            if self.crawl_state is not None:
+                self.crawl_state.flush()
+                self.crawl_state = None
             if self.use_selenium:
-                self.driver.quit()
+                self.browser_pool.close()
+                self.logger.info("Fetched %d pages over plain HTTP, %d with a browser (%d started)",
+                                 self.plain_fetches, self.browser_fetches,
+                                 self.browser_pool.started)
             self.db_cursor.close()
             self.db_connection.close()
+            self.log_host_stats()
+            self.logger.info("%d recipe pages not modified since last run", self.not_modified)
+            self.logger.info("%d recipes unchanged (digest match)", self.unchanged)
+            self.logger.info("%d known recipes skipped (checked within %s)",
+                             self.skipped_fresh, self.refresh_after)
             self.logger.info("Scraper finished for site: %s", self.site_name)
+
+    def reparse(self, chunk_size=500, workers=None):
+        """
+        Offline mode: run parse_recipe (with the current config) over this
+        site's stored raw_recipes.raw_html and upsert clean_recipes, without
+        any network access.  Rows are streamed through a server-side cursor
+        ``chunk_size`` at a time, so memory stays flat regardless of table
+        size; recipes whose parsed fields did not change are not rewritten.
+        Compressed rows are decoded one at a time, just before parsing.
+
+        With no network in the way parsing is the bottleneck, so unless
+        ``workers`` or the config's ``parse_workers`` says otherwise it runs
+        in a process pool with one parser per core (0 parses inline).
+        """
+        self.logger.info("Re-parsing stored pages for site: %s", self.site_name)
+        if workers is None:
+            workers = self.config.get("parse_workers", "auto")
+        self.parse_workers = resolve_workers(workers)
+        in_flight = {}
+        stream = self.db_connection.cursor(name="reparse_raw_recipes", withhold=True)
+        stream.itersize = chunk_size
+        try:
+            stream.execute(
+                """
+                SELECT r.id, r.url, r.raw_html, r.raw_html_compressed,
+                       r.html_codec, r.html_dict_id,
+                       array_remove(array_agg(c.content_digest), NULL)
+                FROM raw_recipes r
+                LEFT JOIN clean_recipes c ON c.raw_id = r.id
+                WHERE r.site_name = %s
+                GROUP BY r.id
+                ORDER BY r.id;
+                """,
+                (self.site_name,),
+            )
+
+            def pages():
+                # one row per raw page (url is unique), with the digests of
+                # every clean row built from it – a title change leaves the
+                # old one behind
+                for raw_id, url, raw_html, blob, codec, dict_id, clean_digests in stream:
+                    try:
+                        html = decode_html(raw_html, blob, codec,
+                                           self.html_dictionary_by_id(dict_id))
+                    except Exception as e:
+                        self.logger.error("Could not decode stored HTML for %s: %s", url, e)
+                        continue
+                    in_flight[url] = (raw_id, clean_digests or ())
+                    yield url, html
+
+            self.writer = RecipeWriter(
+                self.db_connection,
+                self.site_name,
+                batch_size=self.batch_size,
+                logger=self.logger,
+            )
+            with self.writer:
+                for url, html, parsed in self.iter_parsed(pages()):
+                    raw_id, known_clean = in_flight.pop(url)
+                    digest = recipe_digest(parsed)
+                    if digest in known_clean:
+                        self.unchanged += 1
+                        continue
+                    self.writer.add(PendingRecipe(
+                        url=url,
+                        raw_html=html,
+                        parsed=parsed,
+                        raw_digest=None,
+                        clean_digest=digest,
+                        raw_id=raw_id,
+                    ))
+            self.logger.info("Re-parse updated %d recipes, %d unchanged",
+                             self.writer.rows_written, self.unchanged)
+        finally:
+            self.writer = None
+            stream.close()
+            self.db_cursor.close()
+            self.db_connection.close()
+
+    def load_validators(self):
+        """Load stored ETag / Last-Modified validators for this site in one query."""
+        if self.use_selenium or not self.conditional_get:
+            return
+        try:
+            self.db_cursor.execute(
+                "SELECT url, etag, last_modified FROM http_validators WHERE site_name = %s;",
+                (self.site_name,),
+            )
+            self._validators = {url: (etag, lm) for url, etag, lm in self.db_cursor.fetchall()}
+        except Exception as e:
+            self.db_connection.rollback()
+            self._validators = {}
+            self.logger.error("Could not load HTTP validators: %s", e)
+        self.logger.info("Loaded %d HTTP validators", len(self._validators))
+
+    def load_known_digests(self):
+        """Load raw/clean content digests for this site's stored recipes."""
+        try:
+            self.db_cursor.execute(
+                """
+                SELECT r.url, r.id, r.content_digest, c.content_digest, r.checked_at
+                FROM raw_recipes r
+                LEFT JOIN clean_recipes c ON c.raw_id = r.id
+                WHERE r.site_name = %s;
+                """,
+                (self.site_name,),
+            )
+            self._known, self._checked_at = {}, {}
+            for url, raw_id, raw_dg, clean_dg, checked_at in self.db_cursor.fetchall():
+                url = normalize_url(url)
+                self._known[url] = (raw_id, raw_dg, clean_dg)
+                self._checked_at[url] = checked_at
+        except Exception as e:
+            self.db_connection.rollback()
+            self._known, self._checked_at = {}, {}
+            self.logger.error("Could not load content digests: %s", e)
+        self.logger.info("Loaded %d known recipe digests", len(self._known))
+
+    def load_html_dictionary(self):
+        """
+        ``(id, data)`` of the newest html_dictionaries row for this site when
+        the "deflate-dict" codec is configured, else None (looked up once).
+        """
+        if self.html_codec != DEFLATE_DICT or self._html_dictionary_loaded:
+            return self.html_dictionary
+        self._html_dictionary_loaded = True
+        try:
+            self.db_cursor.execute(
+                """
+                SELECT id, data FROM html_dictionaries
+                WHERE site_name = %s ORDER BY id DESC LIMIT 1;
+                """,
+                (self.site_name,),
+            )
+            row = self.db_cursor.fetchone()
+        except Exception as e:
+            self.db_connection.rollback()
+            row = None
+            self.logger.error("Could not load HTML dictionary: %s", e)
+        if row:
+            self.html_dictionary = (row[0], bytes(row[1]))
+        else:
+            self.logger.warning("No HTML dictionary for %s – storing gzip instead",
+                                self.site_name)
+        return self.html_dictionary
+
+    def html_dictionary_by_id(self, dict_id):
+        """Dictionary bytes for a stored html_dict_id (cached per scraper)."""
+        if dict_id is None:
+            return None
+        if dict_id not in self._dictionaries:
+            self.db_cursor.execute("SELECT data FROM html_dictionaries WHERE id = %s;", (dict_id,))
+            self._dictionaries[dict_id] = bytes(self.db_cursor.fetchone()[0])
+        return self._dictionaries[dict_id]
+
+    def cycle_complete(self):
+        """True unless the time budget cut this run short or URLs are still pending."""
+        if self.budget_exhausted:
+            return False
+        if self.crawl_state is None:
+            return True
+        try:
+            return self.crawl_state.unfinished() == 0
+        except Exception as e:
+            self.db_connection.rollback()
+            self.logger.error("Could not read crawl state: %s", e)
+            return False
+
+    def full_crawl_due(self):
+        """Incremental sites crawl everything when the last full crawl is too old."""
+        if not self.incremental:
+            return True
+        try:
+            self.db_cursor.execute(
+                "SELECT last_full_crawl_at FROM site_crawls WHERE site_name = %s;",
+                (self.site_name,),
+            )
+            row = self.db_cursor.fetchone()
+        except Exception as e:
+            self.db_connection.rollback()
+            self.logger.error("Could not read crawl history: %s", e)
+            return True
+        return not row or not row[0] or \
+            datetime.now() - row[0] >= timedelta(days=self.full_crawl_days)
+
+    def record_full_crawl(self):
+        try:
+            self.db_cursor.execute(
+                """
+                INSERT INTO site_crawls (site_name, last_full_crawl_at)
+                VALUES (%s, NOW())
+                ON CONFLICT (site_name) DO UPDATE SET last_full_crawl_at = NOW();
+                """,
+                (self.site_name,),
+            )
+            self.db_connection.commit()
+        except Exception as e:
+            self.db_connection.rollback()
+            self.logger.error("Could not record full crawl: %s", e)
+
+    def log_host_stats(self):
+        """Log (and return) the per-host politeness counters for this run."""
+        self.host_stats = self.scheduler.stats()
+        for host, st in sorted(self.host_stats.items()):
+            self.logger.info(
+                "Host %s: %d requests, %d throttled waits (%.1fs), %d x 429",
+                host, st.requests, st.throttled_waits, st.wait_seconds, st.status_429,
+            )
+        return self.host_stats
+
+    def iter_fetched(self, links):
+        """
+        Yield ``(url, html)`` for every link that fetched successfully and
+        changed since the last run.  Uses the AsyncFetchEngine when
+        ``concurrency`` > 1, one link at a time otherwise.
+        """
+        fetch = partial(self.fetch_page, conditional=True)
+        if self.concurrency > 1:
+            self.logger.info("Fetching with concurrency=%d", self.concurrency)
+            results = AsyncFetchEngine(fetch, self.concurrency, self.logger).iter_pages(links)
+        else:
+            results = self._fetch_serially(fetch, links)
+        for link, html, error in results:
+            if error is not None:
+                self.logger.error("Error on link %s: %s", link, error)
+                self._mark(link, FAILED, error)
+            elif html is None:
+                self.not_modified += 1
+                if self.writer is not None and self._stored_unchanged(link, None):
+                    self.writer.add_checked(link)
+                else:
+                    self._mark(link, DONE)
+            else:
+                yield link, html
+
+    @staticmethod
+    def _fetch_serially(fetch, links):
+        for link in links:
+            try:
+                yield link, fetch(link), None
+            except Exception as e:
+                yield link, None, e
+
+    def iter_parsed(self, pages):
+        """
+        Yield ``(url, html, parsed)`` for ``(url, html)`` pages.  With
+        ``parse_workers`` set, parsing runs in a process pool; otherwise
+        parse_recipe is called inline.
+        """
+        if self.parse_workers:
+            with ParsePool(self.config, self.site_name, self.parse_workers) as pool:
+                for link, html, parsed, error in pool.imap(pages):
+                    if error is not None:
+                        self.logger.error("Error parsing %s: %s", link, error)
+                        self._mark(link, FAILED, error)
+                    else:
+                        yield link, html, parsed
+            return
+        for link, html in pages:
+            try:
+                parsed = self.parse_recipe(html)
+            except Exception as e:
+                self.logger.error("Error parsing %s: %s", link, e)
+                self._mark(link, FAILED, e)
+                continue
+            yield link, html, parsed
@@ -0,0 +1,135 @@
+"""
+browser_pool.py
+---------------
+Reusable headless browsers for ``use_selenium`` sites.
+
+``BrowserPool`` starts browsers lazily – none at all if every page can be
+served by the plain-HTTP fast path – up to ``size`` of them, and hands each
+one to a single fetch at a time, so the concurrent fetch engine and the
+listing crawl can drive several pages in parallel.
+
+``make_chrome`` builds the default headless Chrome: page-load strategy
+``eager`` (return at DOMContentLoaded, don't wait for every subresource),
+and images, stylesheets and fonts blocked, since only the DOM is scraped.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+BLOCKED_RESOURCES = [
+    "*.css", "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm",
+]
+
+
+def make_chrome():
+    """Headless Chrome tuned for scraping rendered DOM."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.page_load_strategy = "eager"
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    })
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCES})
+    except Exception:
+        pass  # CDP unavailable – the prefs above still block images
+    return driver
+
+
+class BrowserPool:
+    """
+    :param size:    maximum number of browsers alive at once
+    :param factory: zero-argument callable returning a new WebDriver
+    :param logger:  optional logger
+    :param healthy_errors: exception types that leave the browser usable
+                    (e.g. a wait timeout); any other error replaces it
+    """
+
+    def __init__(self, size: int = 2, factory: Callable = make_chrome, logger=None,
+                 healthy_errors: tuple = ()):
+        self.size = max(1, size)
+        self.factory = factory
+        self.logger = logger
+        self.healthy_errors = healthy_errors
+        self.started = 0
+        self._idle: queue.Queue = queue.Queue()
+        self._all: list = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def browser(self) -> Iterator:
+        """Borrow a browser; one that failed inside the block is replaced."""
+        driver = self._acquire()
+        try:
+            yield driver
+        except Exception as e:
+            if isinstance(e, self.healthy_errors):
+                self._idle.put(driver)
+            else:
+                self._discard(driver)
+            raise
+        else:
+            self._idle.put(driver)
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                can_start = len(self._all) < self.size
+                if can_start:
+                    self._all.append(None)        # reserve the slot
+            if can_start:
+                break
+            try:
+                # a discarded browser frees a slot without returning to _idle
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._lock:
+                self._all.remove(None)
+            raise
+        with self._lock:
+            self._all[self._all.index(None)] = driver
+            self.started += 1
+        if self.logger:
+            self.logger.info("Started browser %d/%d", self.started, self.size)
+        return driver
+
+    def _discard(self, driver) -> None:
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            drivers, self._all = [d for d in self._all if d is not None], []
+        self._idle = queue.Queue()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("Could not quit browser: %s", e)
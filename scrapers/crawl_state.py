@@ -0,0 +1,249 @@
+"""
+crawl_state.py
+--------------
+Durable per-URL crawl progress (``crawl_state`` table) so an interrupted
+``BaseRecipeScraper.run`` picks up where it stopped.
+
+Every listing page and recipe URL of the current crawl cycle has a row:
+``pending`` when discovered, ``done`` once handled, ``failed`` (with the
+attempt count, last error and the time of the next allowed attempt) when
+it could not be fetched or parsed.  While ``pending`` rows exist the cycle
+is unfinished and the next run resumes it from those rows instead of the
+start URLs.  Failed URLs are retried with exponential backoff on later
+runs, up to ``max_attempts``; a new cycle always starts from its start
+URLs again, with their attempts reset.
+
+Updates can come from the listing-crawl and fetch threads, so ``mark``
+only buffers them (under a lock); ``flush`` writes the buffer with one
+statement and commits, and must be called from the thread that owns the
+DB connection.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+
+from scrapers.frontier import normalize_url
+
+LISTING = "listing"
+RECIPE = "recipe"
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+CREATE_SQL = """
+    CREATE TABLE IF NOT EXISTS crawl_state (
+        url             TEXT PRIMARY KEY,
+        site_name       TEXT NOT NULL,
+        kind            TEXT NOT NULL,
+        status          TEXT NOT NULL,
+        attempts        INTEGER NOT NULL DEFAULT 0,
+        last_error      TEXT,
+        next_attempt_at TIMESTAMP,
+        updated_at      TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+    CREATE INDEX IF NOT EXISTS crawl_state_site_idx ON crawl_state (site_name, status);
+"""
+
+# attempts / next_attempt_at only move on failures; "done" resets them.
+# {base} / {max_backoff} are filled in (as numbers) per CrawlState.
+UPSERT_SQL = """
+    INSERT INTO crawl_state AS cs
+    (url, site_name, kind, status, attempts, last_error, next_attempt_at, updated_at)
+    SELECT v.url, v.site_name, v.kind, v.status,
+           CASE WHEN v.status = 'failed' THEN 1 ELSE 0 END,
+           v.last_error,
+           CASE WHEN v.status = 'failed'
+                THEN NOW() + make_interval(secs => v.backoff) END,
+           NOW()
+    FROM (VALUES %s) AS v (url, site_name, kind, status, last_error, backoff)
+    ON CONFLICT (url) DO UPDATE
+       SET kind            = EXCLUDED.kind,
+           status          = EXCLUDED.status,
+           attempts        = CASE EXCLUDED.status
+                               WHEN 'failed' THEN cs.attempts + 1
+                               WHEN 'done'   THEN 0
+                               ELSE cs.attempts END,
+           last_error      = EXCLUDED.last_error,
+           next_attempt_at = CASE EXCLUDED.status
+                               WHEN 'failed' THEN NOW() + make_interval(
+                                   secs => LEAST({max_backoff}, {base} * power(2, cs.attempts)))
+                               WHEN 'pending' THEN cs.next_attempt_at
+                               END,
+           updated_at      = NOW();
+"""
+UPSERT_TEMPLATE = "(%s, %s, %s, %s, %s, %s::float8)"
+
+
+@dataclass
+class CrawlPlan:
+    """Where a run starts: listing pages to crawl, recipe URLs to (re)try
+    before anything else, and what this cycle already finished."""
+    resumed: bool
+    listing_urls: list = field(default_factory=list)
+    recipe_urls: list = field(default_factory=list)
+    done_pages: set = field(default_factory=set)
+    done_links: set = field(default_factory=set)
+    gave_up: int = 0
+
+
+class CrawlState:
+    """
+    :param connection:     psycopg2 connection (used from one thread only)
+    :param site_name:      site whose rows are read and written
+    :param retry_base:     seconds before the first retry of a failed URL
+    :param max_backoff:    cap of the exponential backoff, in seconds
+    :param max_attempts:   failed URLs are given up after this many attempts
+    :param flush_every:    buffered updates that trigger ``maybe_flush``
+    """
+
+    def __init__(self, connection, site_name: str, logger=None, retry_base: float = 300,
+                 max_backoff: float = 86400, max_attempts: int = 5, flush_every: int = 200):
+        self.connection = connection
+        self.site_name = site_name
+        self.logger = logger
+        self.retry_base = retry_base
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.flush_every = flush_every
+        self._upsert = UPSERT_SQL.format(base=float(retry_base), max_backoff=float(max_backoff))
+        self._buffer: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    def start(self, start_urls) -> CrawlPlan:
+        """Resume the unfinished cycle, or start a new one from ``start_urls``."""
+        cur = self.connection.cursor()
+        try:
+            cur.execute(CREATE_SQL)
+            cur.execute(
+                """
+                SELECT url, kind, status, attempts, next_attempt_at
+                FROM crawl_state WHERE site_name = %s;
+                """,
+                (self.site_name,),
+            )
+            rows = cur.fetchall()
+            now = datetime.now()
+            resumed = any(status == PENDING for _, _, status, _, _ in rows)
+            plan = CrawlPlan(resumed=resumed)
+            # a new cycle always crawls its start URLs, whatever happened to them before
+            restart = set() if resumed else {normalize_url(u) for u in start_urls}
+            for url, kind, status, attempts, next_at in rows:
+                if kind == LISTING and normalize_url(url) in restart:
+                    continue
+                if status == PENDING:
+                    target = plan.listing_urls if kind == LISTING else plan.recipe_urls
+                    target.append(url)
+                elif status == FAILED:
+                    if attempts >= self.max_attempts:
+                        plan.gave_up += 1
+                        (plan.done_pages if kind == LISTING else plan.done_links).add(url)
+                    elif next_at is None or next_at <= now:
+                        target = plan.listing_urls if kind == LISTING else plan.recipe_urls
+                        target.append(url)
+                    else:
+                        # still backing off – not this run
+                        (plan.done_pages if kind == LISTING else plan.done_links).add(url)
+                elif resumed:
+                    (plan.done_pages if kind == LISTING else plan.done_links).add(url)
+            if not resumed:
+                # new cycle: forget what the previous one finished
+                cur.execute(
+                    "DELETE FROM crawl_state WHERE site_name = %s AND status = %s;",
+                    (self.site_name, DONE),
+                )
+                cur.execute(
+                    """
+                    UPDATE crawl_state SET attempts = 0, last_error = NULL, next_attempt_at = NULL
+                    WHERE site_name = %s AND url = ANY(%s);
+                    """,
+                    (self.site_name, sorted(restart)),
+                )
+                plan.listing_urls = list(dict.fromkeys(list(start_urls) + plan.listing_urls))
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cur.close()
+        for url in plan.listing_urls:
+            self.mark(url, LISTING, PENDING)
+        # retried recipes are yielded before the crawl finds them again
+        plan.done_links.update(normalize_url(u) for u in plan.recipe_urls)
+        plan.done_pages = {normalize_url(u) for u in plan.done_pages}
+        plan.done_links = {normalize_url(u) for u in plan.done_links}
+        if self.logger:
+            self.logger.info(
+                "%s crawl cycle: %d listing pages and %d recipes queued, %d URLs given up",
+                "Resuming" if resumed else "Starting", len(plan.listing_urls),
+                len(plan.recipe_urls), plan.gave_up,
+            )
+        return plan
+
+    # ------------------------------------------------------------------ #
+    def mark(self, url: str, kind: str, status: str, error=None) -> None:
+        """Buffer a status change (thread-safe); the last one per URL wins."""
+        entry = (normalize_url(url), self.site_name, kind, status,
+                 str(error)[:1000] if error is not None else None, float(self.retry_base))
+        with self._lock:
+            self._buffer[entry[0]] = entry
+
+    def page_crawled(self, page_url, next_url, links) -> None:
+        """``CrawlFrontier.on_page`` hook."""
+        if next_url:
+            self.mark(next_url, LISTING, PENDING)
+        for link in links:
+            self.mark(link, RECIPE, PENDING)
+        self.mark(page_url, LISTING, DONE)
+
+    def page_failed(self, page_url, error) -> None:
+        """``CrawlFrontier.on_error`` hook."""
+        self.mark(page_url, LISTING, FAILED, error)
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    def maybe_flush(self) -> None:
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            rows, self._buffer = list(self._buffer.values()), {}
+        if not rows:
+            return
+        cur = self.connection.cursor()
+        try:
+            execute_values(cur, self._upsert, rows,
+                           template=UPSERT_TEMPLATE, page_size=len(rows))
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            with self._lock:
+                # keep newer updates made meanwhile, re-buffer the rest
+                for row in rows:
+                    self._buffer.setdefault(row[0], row)
+            if self.logger:
+                self.logger.error("Could not save crawl state: %s", e)
+        finally:
+            cur.close()
+
+    def unfinished(self) -> int:
+        """Pending URLs left for this site (0 → the cycle is complete)."""
+        cur = self.connection.cursor()
+        try:
+            cur.execute(
+                "SELECT COUNT(*) FROM crawl_state WHERE site_name = %s AND status = %s;",
+                (self.site_name, PENDING),
+            )
+            row = cur.fetchone()
+            return row[0] if row else 0
+        finally:
+            cur.close()
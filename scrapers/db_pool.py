@@ -0,0 +1,207 @@
+"""
+db_pool.py
+----------
+Process-wide Postgres connection pools shared by the scrapers and the
+pipeline scripts.
+
+``connect(dsn, **kwargs)`` borrows a connection from the pool for those
+connection arguments (created on first use) and returns a
+``PooledConnection``: it behaves like the psycopg2 connection, but
+``close()`` hands it back to the pool instead of closing the socket.  When
+``run_pipeline.py`` scrapes several sites and then runs every stage in one
+process, they all draw from the same few connections.
+
+Connections are opened lazily, up to ``DB_POOL_SIZE``; past that a
+borrower waits for one to be returned instead of opening more.  An idle
+connection is checked with ``SELECT 1`` before it is lent out again
+(pre-ping; a dead one is replaced) and whatever a borrower left open is
+rolled back when it is returned.
+
+Environment:
+    DB_POOL_SIZE             connections per pool (default 10)
+    DB_STATEMENT_TIMEOUT_MS  server-side statement_timeout, 0 = off (default)
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def statement_timeout_option(timeout_ms: int) -> dict:
+    """Connection kwargs that set ``statement_timeout`` (nothing when 0)."""
+    if not timeout_ms:
+        return {}
+    return {"options": f"-c statement_timeout={int(timeout_ms)}"}
+
+
+class ConnectionPool:
+    """
+    :param dsn:          connection string (None → only ``connect_kwargs``)
+    :param size:         connections alive at once; further borrowers wait
+    :param pre_ping:     test an idle connection before lending it out
+    :param statement_timeout_ms: ``statement_timeout`` for every connection
+    :param connect_kwargs: passed on to ``psycopg2.connect``
+    """
+
+    def __init__(self, dsn: Optional[str] = None, size: int = 10, pre_ping: bool = True,
+                 statement_timeout_ms: int = 0, **connect_kwargs):
+        self.size = max(1, size)
+        self.pre_ping = pre_ping
+        self.opened = 0
+        self.closed = False
+        self._args = (dsn,) if dsn else ()
+        self._kwargs = {**connect_kwargs, **statement_timeout_option(statement_timeout_ms)}
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+
+    def getconn(self, timeout: Optional[float] = None):
+        """Borrow a raw connection, waiting for a free one if needed."""
+        if self.closed:
+            raise PoolError("connection pool is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolError("timed out waiting for a pooled connection")
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                if not self.pre_ping or self._alive(conn):
+                    return conn
+                self._discard(conn)
+            conn = psycopg2.connect(*self._args, **self._kwargs)
+            with self._lock:
+                self.opened += 1
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, close: bool = False) -> None:
+        """Return a connection; an open transaction is rolled back first."""
+        try:
+            if not close and not self.closed and not getattr(conn, "closed", 0):
+                try:
+                    if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    if conn.autocommit:
+                        conn.autocommit = False
+                    self._idle.put(conn)
+                    return
+                except Exception:
+                    pass
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def connect(self, timeout: Optional[float] = None) -> "PooledConnection":
+        return PooledConnection(self, self.getconn(timeout))
+
+    @contextmanager
+    def connection(self) -> Iterator["PooledConnection"]:
+        conn = self.connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def closeall(self) -> None:
+        """Close the idle connections; borrowed ones are closed when returned."""
+        self.closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    @staticmethod
+    def _discard(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _alive(conn) -> bool:
+        if getattr(conn, "closed", 0):
+            return False
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1;")
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+
+class PooledConnection:
+    """A borrowed connection; ``close()`` gives it back to its pool."""
+
+    def __init__(self, pool: ConnectionPool, conn):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_conn", conn)
+
+    @property
+    def raw(self):
+        return self._conn
+
+    def close(self) -> None:
+        conn = self._conn
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            self._pool.putconn(conn)
+
+    @property
+    def closed(self) -> int:
+        return 1 if self._conn is None else getattr(self._conn, "closed", 0)
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+
+def get_pool(dsn: Optional[str] = None, **connect_kwargs) -> ConnectionPool:
+    """The shared pool for these connection arguments (created on first use)."""
+    key = (dsn, tuple(sorted((k, str(v)) for k, v in connect_kwargs.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(
+                dsn,
+                size=int(os.getenv("DB_POOL_SIZE", 10)),
+                statement_timeout_ms=int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0)),
+                **connect_kwargs,
+            )
+            _pools[key] = pool
+        return pool
+
+
+def connect(dsn: Optional[str] = None, **connect_kwargs) -> PooledConnection:
+    """Drop-in for ``psycopg2.connect`` that borrows from the shared pool."""
+    return get_pool(dsn, **connect_kwargs).connect()
+
+
+def close_all() -> None:
+    """Close every pooled connection (end of a pipeline run)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.closeall()
@@ -0,0 +1,281 @@
+"""
+db_writer.py
+------------
+Batched writes of scraped recipes.
+
+``write_batch`` stores any number of recipes with a fixed number of
+statements (multi-row ``INSERT ... ON CONFLICT ... RETURNING`` via
+``execute_values``), and ``RecipeWriter`` buffers recipes from
+``BaseRecipeScraper.run`` and commits once per ``batch_size`` of them.
+The raw HTML is stored with the configured ``html_codec`` (plain TEXT by
+default, see ``html_codec.py``).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from psycopg2.extras import execute_values
+
+from scrapers.html_codec import DEFLATE_DICT, GZIP, PLAIN, encode_html
+
+INSERT_RAW = """
+    INSERT INTO raw_recipes
+    (site_name, url, raw_html, raw_html_compressed, html_codec, html_dict_id,
+     content_digest)
+    VALUES %s
+    ON CONFLICT (url) DO UPDATE
+       SET raw_html            = EXCLUDED.raw_html,
+           raw_html_compressed = EXCLUDED.raw_html_compressed,
+           html_codec          = EXCLUDED.html_codec,
+           html_dict_id        = EXCLUDED.html_dict_id,
+           content_digest      = EXCLUDED.content_digest,
+           scraped_at          = NOW(),
+           checked_at          = NOW()
+     WHERE raw_recipes.content_digest IS DISTINCT FROM EXCLUDED.content_digest
+    RETURNING url, id;
+"""
+
+INSERT_CLEAN = """
+    INSERT INTO clean_recipes
+    (raw_id, site_name, recipe_title, ingredients, instructions, tags,
+     content_digest, scraped_at)
+    VALUES %s
+    ON CONFLICT (site_name, recipe_title)
+    DO UPDATE
+       SET raw_id         = EXCLUDED.raw_id,
+           ingredients    = EXCLUDED.ingredients,
+           instructions   = EXCLUDED.instructions,
+           tags           = EXCLUDED.tags,
+           content_digest = EXCLUDED.content_digest,
+           scraped_at     = NOW()
+     WHERE clean_recipes.content_digest IS DISTINCT FROM EXCLUDED.content_digest
+        OR clean_recipes.raw_id IS DISTINCT FROM EXCLUDED.raw_id;
+"""
+CLEAN_TEMPLATE = "(%s, %s, %s, %s, %s, %s, %s, NOW())"
+
+INSERT_VALIDATORS = """
+    INSERT INTO http_validators (url, site_name, etag, last_modified, checked_at)
+    VALUES %s
+    ON CONFLICT (url) DO UPDATE
+       SET etag          = EXCLUDED.etag,
+           last_modified = EXCLUDED.last_modified,
+           checked_at    = NOW();
+"""
+VALIDATORS_TEMPLATE = "(%s, %s, %s, %s, NOW())"
+
+# Pages fetched again without a new raw row (unchanged, 304, clean-only update)
+TOUCH_CHECKED = "UPDATE raw_recipes SET checked_at = NOW() WHERE url = ANY(%s);"
+
+
+@dataclass
+class PendingRecipe:
+    """A parsed recipe waiting to be written.  ``raw_id`` is set when the
+    stored HTML is known to be current, so the raw insert can be skipped."""
+    url: str
+    raw_html: str
+    parsed: dict
+    raw_digest: str
+    clean_digest: str
+    raw_id: Optional[int] = None
+    validators: Optional[tuple] = None
+
+
+def _last_wins(items, key):
+    """Drop earlier duplicates – ON CONFLICT cannot touch a row twice per statement."""
+    return list({key(it): it for it in items}.values())
+
+
+def raw_row(site_name: str, recipe: PendingRecipe, codec: str = PLAIN,
+            dictionary: Optional[tuple[int, bytes]] = None) -> tuple:
+    """
+    ``INSERT_RAW`` values for ``recipe`` with the page encoded by ``codec``.
+    ``dictionary`` is ``(html_dictionaries.id, data)``; "deflate-dict"
+    without one falls back to gzip.
+    """
+    dict_id = None
+    if codec == DEFLATE_DICT:
+        if dictionary:
+            dict_id, data = dictionary
+        else:
+            codec, data = GZIP, None
+        text, blob = encode_html(recipe.raw_html, codec, data)
+    else:
+        text, blob = encode_html(recipe.raw_html, codec)
+    return (site_name, recipe.url, text, blob, codec, dict_id, recipe.raw_digest)
+
+
+def write_batch(cur, site_name: str, recipes: list[PendingRecipe],
+                validators: list[tuple[str, tuple]] = (), codec: str = PLAIN,
+                dictionary: Optional[tuple[int, bytes]] = None,
+                checked: list[str] = ()) -> None:
+    """
+    Write ``recipes`` (and extra ``(url, (etag, last_modified))`` validators)
+    with one statement per table, the HTML encoded with ``codec``, and bump
+    ``checked_at`` of the already stored ``checked`` URLs.  Fills in
+    ``raw_id`` on every recipe.  Does not commit.
+    """
+    recipes = _last_wins(recipes, key=lambda r: r.url)
+
+    to_insert = [r for r in recipes if r.raw_id is None]
+    if to_insert:
+        returned = execute_values(
+            cur, INSERT_RAW,
+            [raw_row(site_name, r, codec, dictionary) for r in to_insert],
+            page_size=len(to_insert), fetch=True,
+        )
+        ids = dict(returned)
+        missing = [r.url for r in to_insert if r.url not in ids]
+        if missing:
+            # unchanged HTML → no row returned; look the ids up in one go
+            cur.execute("SELECT url, id FROM raw_recipes WHERE url = ANY(%s);", (missing,))
+            ids.update(cur.fetchall())
+        for r in to_insert:
+            r.raw_id = ids.get(r.url)
+
+    if recipes:
+        clean = _last_wins(recipes, key=lambda r: (r.parsed["site_name"], r.parsed["title"]))
+        execute_values(
+            cur, INSERT_CLEAN,
+            [
+                (
+                    r.raw_id,
+                    r.parsed["site_name"],
+                    r.parsed["title"],
+                    r.parsed["ingredients"],
+                    r.parsed["instructions"],
+                    r.parsed["tags"],
+                    r.clean_digest,
+                )
+                for r in clean
+            ],
+            template=CLEAN_TEMPLATE, page_size=len(clean),
+        )
+
+    all_validators = [(r.url, r.validators) for r in recipes if r.validators]
+    all_validators += list(validators)
+    if all_validators:
+        rows = _last_wins(all_validators, key=lambda v: v[0])
+        execute_values(
+            cur, INSERT_VALIDATORS,
+            [(url, site_name, *v) for url, v in rows],
+            template=VALIDATORS_TEMPLATE, page_size=len(rows),
+        )
+
+    if checked:
+        cur.execute(TOUCH_CHECKED, (list(set(checked)),))
+
+
+@dataclass
+class RecipeWriter:
+    """
+    Buffer recipes and flush them with ``write_batch`` every ``batch_size``
+    items, committing once per batch.  Used as a context manager, whatever is
+    still buffered is flushed on exit.
+
+    If a batch fails it is rolled back and retried one recipe per transaction,
+    so a single bad row only loses itself.  ``on_saved(recipe)`` is called for
+    every recipe that was committed.  ``on_committed(url)`` is called for
+    every URL whose recipe, validators or checked_at bump was committed, and
+    ``on_failed(url, error)`` for every URL whose write was lost.  ``codec`` /
+    ``dictionary`` are passed on to ``write_batch``; URLs given to
+    ``add_checked`` are written with the validators.
+    """
+    connection: object
+    site_name: str
+    batch_size: int = 50
+    logger: object = None
+    on_saved: Optional[Callable[[PendingRecipe], None]] = None
+    on_committed: Optional[Callable[[str], None]] = None
+    on_failed: Optional[Callable[[str, Exception], None]] = None
+    codec: str = PLAIN
+    dictionary: Optional[tuple] = None
+    recipes: list = field(default_factory=list)
+    validators: list = field(default_factory=list)
+    checked: list = field(default_factory=list)
+    rows_written: int = 0
+    batches: int = 0
+
+    def add(self, recipe: PendingRecipe) -> None:
+        self.recipes.append(recipe)
+        self._maybe_flush()
+
+    def add_validators(self, url: str, validators: tuple) -> None:
+        self.validators.append((url, validators))
+        self._maybe_flush()
+
+    def add_checked(self, url: str) -> None:
+        self.checked.append(url)
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if len(self.recipes) + len(self.validators) + len(self.checked) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.recipes and not self.validators and not self.checked:
+            return
+        recipes, validators, checked = self.recipes, self.validators, self.checked
+        self.recipes, self.validators, self.checked = [], [], []
+        try:
+            self._write(recipes, validators, checked)
+        except Exception as e:
+            self.connection.rollback()
+            if len(recipes) + len(validators) + len(checked) == 1:
+                self._log_error(recipes, e)
+                self._failed(validators, checked, e)
+                return
+            if self.logger:
+                self.logger.error("Batch of %d failed (%s) – retrying one by one",
+                                  len(recipes), e)
+            for r in recipes:
+                try:
+                    self._write([r], [])
+                except Exception as err:
+                    self.connection.rollback()
+                    self._log_error([r], err)
+            if validators or checked:
+                try:
+                    self._write([], validators, checked)
+                except Exception as err:
+                    self.connection.rollback()
+                    if self.logger:
+                        self.logger.error("Could not store HTTP validators: %s", err)
+                    self._failed(validators, checked, err)
+
+    def _write(self, recipes, validators, checked=()) -> None:
+        cur = self.connection.cursor()
+        try:
+            write_batch(cur, self.site_name, recipes, validators,
+                        codec=self.codec, dictionary=self.dictionary, checked=checked)
+        finally:
+            cur.close()
+        self.connection.commit()
+        self.batches += 1
+        self.rows_written += len(recipes)
+        if self.on_saved:
+            for r in recipes:
+                self.on_saved(r)
+        if self.on_committed:
+            urls = [r.url for r in recipes] + [url for url, _ in validators] + list(checked)
+            for url in dict.fromkeys(urls):
+                self.on_committed(url)
+
+    def _log_error(self, recipes, error) -> None:
+        for r in recipes:
+            if self.logger:
+                self.logger.error("Database error saving recipe from %s: %s", r.url, error)
+            if self.on_failed:
+                self.on_failed(r.url, error)
+
+    def _failed(self, validators, checked, error) -> None:
+        if self.on_failed:
+            for url in dict.fromkeys([url for url, _ in validators] + list(checked)):
+                self.on_failed(url, error)
+
+    def __enter__(self) -> "RecipeWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
@@ -0,0 +1,130 @@
+"""
+frontier.py
+-----------
+Concurrent listing-page crawl for ``BaseRecipeScraper``.
+
+``CrawlFrontier`` walks the pagination chains of all ``start_urls`` at the
+same time: every listing page is fetched on a small thread pool and, as
+soon as it is parsed, its next page is queued and its recipe links are
+yielded – normalised and deduplicated – so the detail-fetch stage can start
+on them while discovery is still going.
+
+An optional ``follow_next(links)`` callback sees each page's normalised
+links and decides whether that page's next page is worth crawling (the
+incremental mode stops a chain once a page holds only known recipes).
+``on_page`` / ``on_error`` report every crawled listing page, which is what
+the persistent crawl state records to resume an interrupted run.
+
+``normalize_url`` makes URLs comparable: lower-case scheme and host, no
+default port, no fragment, tracking parameters (``utm_*``, ``fbclid``, …)
+removed and the remaining query parameters sorted.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref", "ref_src",
+}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+class CrawlFrontier:
+    """
+    :param fetch:         callable ``url -> html`` for listing pages
+    :param extract_links: callable ``html -> (recipe links, next page URL or None)``
+    :param concurrency:   listing pages fetched at the same time
+    :param logger:        optional logger
+    :param follow_next:   optional ``links -> bool``; False ends the chain
+    :param on_page:       optional ``(page_url, next_url or None, links)``
+                          called before the page's links are yielded
+    :param on_error:      optional ``(page_url, error)`` for failed pages
+    :param done_pages:    listing pages (normalised) not to crawl again
+    :param done_links:    recipe URLs (normalised) not to yield again
+    """
+
+    def __init__(self, fetch: Callable[[str], str],
+                 extract_links: Callable[[str], tuple[list[str], Optional[str]]],
+                 concurrency: int = 4, logger=None,
+                 follow_next: Optional[Callable[[list[str]], bool]] = None,
+                 on_page: Optional[Callable] = None,
+                 on_error: Optional[Callable] = None,
+                 done_pages: Iterable[str] = (), done_links: Iterable[str] = ()):
+        self.fetch = fetch
+        self.extract_links = extract_links
+        self.concurrency = max(1, concurrency)
+        self.logger = logger
+        self.follow_next = follow_next
+        self.on_page = on_page
+        self.on_error = on_error
+        self.pages_crawled = 0
+        self.chains_stopped = 0
+        self.seen_links: set[str] = set(done_links)
+        self.seen_pages: set[str] = set(done_pages)
+
+    def _crawl_page(self, url: str):
+        html = self.fetch(url)
+        return self.extract_links(html)
+
+    def iter_links(self, start_urls: Iterable[str]) -> Iterator[str]:
+        """Yield every new (normalised) recipe URL as soon as it is discovered."""
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix="listing") as pool:
+            pending = {}
+
+            def submit(url):
+                key = normalize_url(url)
+                if key in self.seen_pages:
+                    return False
+                self.seen_pages.add(key)
+                pending[pool.submit(self._crawl_page, url)] = url
+                return True
+
+            for url in start_urls:
+                submit(url)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_url = pending.pop(future)
+                    try:
+                        links, next_url = future.result()
+                    except Exception as err:
+                        if self.logger:
+                            self.logger.error("Failed to fetch page %s: %s", page_url, err)
+                        if self.on_error:
+                            self.on_error(page_url, err)
+                        continue
+                    self.pages_crawled += 1
+                    keys = [normalize_url(link) for link in links]
+                    if next_url:
+                        if self.follow_next is None or self.follow_next(keys):
+                            if not submit(next_url):
+                                next_url = None      # already crawled or queued
+                        else:
+                            self.chains_stopped += 1
+                            next_url = None
+                            if self.logger:
+                                self.logger.info("Stopping pagination after %s", page_url)
+                    new = [key for key in dict.fromkeys(keys) if key not in self.seen_links]
+                    self.seen_links.update(new)
+                    if self.on_page:
+                        self.on_page(page_url, next_url, new)
+                    yield from new
@@ -0,0 +1,106 @@
+"""
+html_codec.py
+-------------
+Compressed storage for ``raw_recipes`` HTML.
+
+A row keeps its page either as plain ``raw_html`` TEXT (codec ``"plain"``)
+or as ``raw_html_compressed`` BYTEA with one of these codecs:
+
+* ``"gzip"``         – stdlib gzip, no setup needed
+* ``"deflate-dict"`` – zlib with a per-site preset dictionary
+                       (``html_dictionaries``) built from the boilerplate the
+                       site's pages share; small pages compress much better
+* ``"zstd"``         – Zstandard, only if the optional ``zstandard`` package
+                       is installed
+
+Callers decode with ``decode_html`` at the point the HTML is actually used,
+so rows can be streamed around compressed.
+"""
+
+from __future__ import annotations
+
+import gzip
+import zlib
+from collections import Counter
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+PLAIN = "plain"
+GZIP = "gzip"
+DEFLATE_DICT = "deflate-dict"
+ZSTD = "zstd"
+
+DICT_SIZE = 32 * 1024   # deflate can only look back 32 KiB
+
+
+def available_codecs() -> list[str]:
+    codecs = [PLAIN, GZIP, DEFLATE_DICT]
+    if zstandard is not None:
+        codecs.append(ZSTD)
+    return codecs
+
+
+def encode_html(html: str, codec: str, dictionary: bytes | None = None
+                ) -> tuple[str | None, bytes | None]:
+    """Return ``(raw_html, raw_html_compressed)`` column values for ``codec``."""
+    if codec == PLAIN:
+        return html, None
+    data = html.encode("utf-8")
+    if codec == GZIP:
+        return None, gzip.compress(data, compresslevel=6)
+    if codec == DEFLATE_DICT:
+        if not dictionary:
+            raise ValueError("deflate-dict needs a dictionary")
+        comp = zlib.compressobj(level=9, zdict=dictionary)
+        return None, comp.compress(data) + comp.flush()
+    if codec == ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd codec needs the 'zstandard' package")
+        return None, zstandard.ZstdCompressor(level=10).compress(data)
+    raise ValueError(f"unknown HTML codec: {codec}")
+
+
+def decode_html(raw_html: str | None, compressed: bytes | None, codec: str | None,
+                dictionary: bytes | None = None) -> str:
+    """Inverse of ``encode_html``; accepts the BYTEA value as memoryview too."""
+    if codec in (None, PLAIN):
+        return raw_html
+    data = bytes(compressed)
+    if codec == GZIP:
+        out = gzip.decompress(data)
+    elif codec == DEFLATE_DICT:
+        if not dictionary:
+            raise ValueError("deflate-dict needs a dictionary")
+        dec = zlib.decompressobj(zdict=dictionary)
+        out = dec.decompress(data) + dec.flush()
+    elif codec == ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd codec needs the 'zstandard' package")
+        out = zstandard.ZstdDecompressor().decompress(data)
+    else:
+        raise ValueError(f"unknown HTML codec: {codec}")
+    return out.decode("utf-8")
+
+
+def train_dictionary(samples: list[str], size: int = DICT_SIZE) -> bytes:
+    """
+    Build a deflate preset dictionary from sample pages of one site: the
+    lines shared by at least half of the samples (nav, footer, scripts),
+    most frequent last because deflate encodes recent bytes most cheaply.
+    """
+    counts: Counter = Counter()
+    for html in samples:
+        counts.update({line.strip() for line in html.splitlines() if len(line.strip()) > 8})
+    threshold = max(2, len(samples) // 2)
+    common = [line for line, n in counts.most_common() if n >= threshold]
+    chunks, total = [], 0
+    for line in common:
+        encoded = line.encode("utf-8") + b"\n"
+        if total + len(encoded) > size:
+            break
+        chunks.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(chunks))
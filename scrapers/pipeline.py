@@ -0,0 +1,102 @@
+"""
+pipeline.py
+-----------
+Process-pool parse stage for the fetch → parse → write pipeline.
+
+HTML parsing is CPU-bound, so ``ParsePool`` hands pages to a
+``ProcessPoolExecutor`` whose workers each hold one ``RecipeParser`` built
+from the site config (compiled once per worker by the initializer).  Only
+``(url, html)`` goes to a worker and only the parsed dict comes back.
+
+``ParsePool.imap`` consumes any iterable of ``(url, html)`` – pages coming
+out of the fetch engine or rows streamed from ``raw_recipes`` – and keeps at
+most ``max_pending`` pages queued in the pool, so a slow consumer (the DB
+writer) throttles the stages in front of it instead of growing memory.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, Optional
+
+from scrapers.parsing import RecipeParser
+
+_PARSER: Optional[RecipeParser] = None
+
+
+def _init_worker(config: dict, site_name: str) -> None:
+    global _PARSER
+    _PARSER = RecipeParser(config, site_name)
+
+
+def _parse(html: str) -> dict:
+    return _PARSER.parse(html)
+
+
+def resolve_workers(value) -> int:
+    """``"auto"`` → one worker per core; anything falsy → 0 (parse inline)."""
+    if value == "auto":
+        return os.cpu_count() or 1
+    return max(0, int(value or 0))
+
+
+class ParsePool:
+    """
+    :param config:      site config used to build each worker's parser
+    :param site_name:   site name stored in the parsed dicts
+    :param workers:     number of parser processes (default: one per core)
+    :param max_pending: pages allowed in the pool at once (default 4 × workers)
+    """
+
+    def __init__(self, config: dict, site_name: str, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.config = config
+        self.site_name = site_name
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ParsePool":
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.config, self.site_name),
+        )
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+        self._executor = None
+
+    def imap(self, pages: Iterable[tuple[str, str]]
+             ) -> Iterator[tuple[str, str, Optional[dict], Optional[Exception]]]:
+        """
+        Yield ``(url, html, parsed, error)`` in completion order; exactly one
+        of ``parsed`` / ``error`` is set.
+        """
+        if self._executor is None:
+            raise RuntimeError("ParsePool must be used as a context manager")
+        pending = {}
+        page_iter = iter(pages)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < self.max_pending:
+                try:
+                    url, html = next(page_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[self._executor.submit(_parse, html)] = (url, html)
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, html = pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    yield url, html, future.result(), None
+                else:
+                    yield url, html, None, error
@@ -0,0 +1,193 @@
+"""
+politeness.py
+-------------
+Proactive per-host throttling shared by every request a scraper makes.
+
+* One token bucket per host (``requests_per_second`` / ``burst`` from the
+  site config's ``"rate_limit"`` block).
+* ``Crawl-delay`` from the host's robots.txt caps the bucket rate.
+* A 429 with ``Retry-After`` pauses the whole host, not just the request that
+  received it, so concurrent fetches back off together.
+* Per-host counters (requests, throttled waits, 429s) for the end-of-run log.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from urllib3.util.retry import Retry
+
+DEFAULT_RATE  = 2.0     # requests per second per host
+DEFAULT_BURST = 4
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    throttled_waits: int = 0
+    wait_seconds: float = 0.0
+    status_429: int = 0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.  ``reserve()`` takes a token (possibly going
+    into debt) and returns how long the caller must sleep before sending.
+    """
+
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def block_for(self, seconds: float) -> None:
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+    def slow_down(self, rate: float, burst: int = 1) -> None:
+        with self.lock:
+            self.rate = min(self.rate, float(rate))
+            self.burst = min(self.burst, max(1, int(burst)))
+            self.tokens = min(self.tokens, float(self.burst))
+
+
+class HostScheduler:
+    """
+    Hands out send slots per host.
+
+    :param rate:        default requests/second per host
+    :param burst:       default bucket size per host
+    :param robots_fetch: optional callable ``robots_url -> text`` used to read
+                         ``Crawl-delay`` once per host (``None`` disables it)
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, robots_fetch=None,
+                 user_agent="*", logger=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = int(burst)
+        self.robots_fetch = robots_fetch
+        self.user_agent = user_agent
+        self.logger = logger
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets: dict[str, TokenBucket] = {}
+        self._stats: dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict, **kwargs) -> "HostScheduler":
+        limits = config.get("rate_limit") or {}
+        return cls(
+            rate=limits.get("requests_per_second", DEFAULT_RATE),
+            burst=limits.get("burst", DEFAULT_BURST),
+            **kwargs,
+        )
+
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def host_of(url: str) -> str:
+        return (urlsplit(url).hostname or "").lower()
+
+    def _bucket(self, url: str) -> tuple[str, TokenBucket]:
+        host = self.host_of(url)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst, clock=self.clock)
+                self._buckets[host] = bucket
+                self._stats[host] = HostStats()
+                new_host = True
+            else:
+                new_host = False
+        if new_host and self.robots_fetch is not None:
+            self._apply_crawl_delay(url, bucket)
+        return host, bucket
+
+    def _apply_crawl_delay(self, url: str, bucket: TokenBucket) -> None:
+        parts = urlsplit(url)
+        robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+        try:
+            text = self.robots_fetch(robots_url)
+        except Exception as e:
+            if self.logger:
+                self.logger.info("No robots.txt for %s (%s)", parts.netloc, e)
+            return
+        if not text:
+            return
+        parser = RobotFileParser()
+        parser.parse(text.splitlines())
+        delay = parser.crawl_delay(self.user_agent)
+        if delay:
+            bucket.slow_down(1.0 / float(delay), burst=1)
+            if self.logger:
+                self.logger.info("Crawl-delay %ss for %s", delay, parts.netloc)
+
+    # ------------------------------------------------------------------ #
+    def wait(self, url: str) -> float:
+        """Block until a request to ``url``'s host may be sent."""
+        host, bucket = self._bucket(url)
+        delay = bucket.reserve()
+        with self._lock:
+            stats = self._stats[host]
+            stats.requests += 1
+            if delay > 0:
+                stats.throttled_waits += 1
+                stats.wait_seconds += delay
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+    def record_429(self, url: str, retry_after: float | None) -> None:
+        """Pause the whole host after a 429 (``Retry-After`` seconds, if given)."""
+        host, bucket = self._bucket(url)
+        with self._lock:
+            self._stats[host].status_429 += 1
+        if retry_after:
+            bucket.block_for(retry_after)
+        if self.logger:
+            self.logger.warning("429 from %s (Retry-After=%s)", host, retry_after)
+
+    def stats(self) -> dict[str, HostStats]:
+        with self._lock:
+            return {h: HostStats(**vars(s)) for h, s in self._stats.items()}
+
+
+class PoliteRetry(Retry):
+    """
+    urllib3 ``Retry`` that reports every 429 to a ``HostScheduler`` before the
+    usual backoff kicks in.
+    """
+
+    def __init__(self, *args, scheduler: HostScheduler | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scheduler = scheduler
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.scheduler = self.scheduler
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None,
+                  _pool=None, _stacktrace=None):
+        if self.scheduler is not None and response is not None and response.status == 429:
+            host = getattr(_pool, "host", "") or ""
+            scheme = getattr(_pool, "scheme", "http") or "http"
+            self.scheduler.record_429(f"{scheme}://{host}/", self.get_retry_after(response))
+        return super().increment(method, url, response, error, _pool, _stacktrace)
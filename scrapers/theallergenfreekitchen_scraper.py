@@ -1,5 +1,6 @@
 import json
 import os
+import sys
 from base_scraper import BaseRecipeScraper
 from pathlib import Path
 
@@ -10,4 +11,7 @@ if __name__ == "__main__":
     with open(config_path, "r", encoding="utf-8") as f:
         config = json.load(f)
     scraper = BaseRecipeScraper(config)
-    scraper.run()
+    if "--reparse" in sys.argv:
+        scraper.reparse()
+    else:
+        scraper.run(full_crawl=True if "--full-crawl" in sys.argv else None)
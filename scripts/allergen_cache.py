@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+allergen_cache.py
+-----------------
+
+Classify every distinct ingredient string once.
+
+After normalisation the same strings ("salt", "olive oil", "all purpose
+flour") recur across thousands of recipes, so the classifiers answer for
+the distinct strings of a chunk and fan the answers back out to all its
+rows.  Answers are remembered for the rest of the run and, given a cursor,
+in the ``allergen_cache`` table keyed by (ingredient, classifier, version)
+– the version being a digest of whatever decides the answer (the
+dictionary for the rules, the model for the ML stage) – so later runs only
+classify strings they have never seen, and a dictionary edit or retrained
+model starts from an empty cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Callable, Iterable, Sequence
+
+from scripts.bulk_load import bulk_insert
+
+CACHE_COLUMNS = ("ingredient", "classifier", "version", "allergens")
+SEPARATOR = ";"
+
+
+def ensure_cache_table(cur) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS allergen_cache (
+            ingredient TEXT NOT NULL,
+            classifier TEXT NOT NULL,
+            version    TEXT NOT NULL,
+            allergens  TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (classifier, version, ingredient)
+        );
+        """
+    )
+
+
+def version_digest(*parts) -> str:
+    """Short digest of ``parts`` (bytes or str) identifying a classifier version."""
+    h = hashlib.md5()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+class AllergenCache:
+    """
+    ``text -> allergens`` answers of one classifier version.  ``classify``
+    callbacks take a list of distinct texts and return one allergen list
+    per text; they only ever see texts neither this run nor, with a
+    cursor, the cache table has answered before.
+    """
+
+    def __init__(self, classifier: str, version: str):
+        self.classifier = classifier
+        self.version = version
+        self.memo: dict[str, list[str]] = {}
+        self.classified = 0
+
+    def _load(self, cur, texts: list[str]) -> None:
+        cur.execute(
+            """
+            SELECT ingredient, allergens FROM allergen_cache
+            WHERE classifier = %s AND version = %s AND ingredient = ANY(%s);
+            """,
+            (self.classifier, self.version, texts),
+        )
+        for text, allergens in cur.fetchall():
+            self.memo[text] = allergens.split(SEPARATOR) if allergens else []
+
+    def answers(self, texts: Iterable[str],
+                classify: Callable[[list[str]], Sequence[list[str]]],
+                cur=None) -> dict[str, list[str]]:
+        """Allergens of every text, classifying only the ones never seen."""
+        todo = [t for t in dict.fromkeys(texts) if t not in self.memo]
+        if todo and cur is not None:
+            self._load(cur, todo)
+            todo = [t for t in todo if t not in self.memo]
+        if todo:
+            fresh = dict(zip(todo, classify(todo)))
+            self.memo.update(fresh)
+            self.classified += len(todo)
+            if cur is not None:
+                bulk_insert(cur, "allergen_cache", CACHE_COLUMNS,
+                            ((t, self.classifier, self.version, SEPARATOR.join(a))
+                             for t, a in fresh.items()),
+                            on_conflict="ON CONFLICT DO NOTHING")
+        return self.memo
+
+    def tag(self, rows, classify, cur=None) -> list[tuple[int, int, str]]:
+        """``(ingredient_id, recipe_id, allergen)`` for ``(id, recipe_id, text)`` rows."""
+        texts = [txt or "" for _, _, txt in rows]
+        answers = self.answers(texts, classify, cur)
+        return [(ing_id, recipe_id, allergen)
+                for (ing_id, recipe_id, _), text in zip(rows, texts)
+                for allergen in answers[text]]
+
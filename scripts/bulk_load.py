@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+bulk_load.py
+------------
+
+Set-based bulk inserts for the pipeline stages.
+
+``bulk_insert`` streams the rows into a temporary staging table with
+``COPY ... FROM STDIN`` (one round-trip for any number of rows) and moves
+them into the target with a single ``INSERT ... SELECT``, so conflict
+handling (``ON CONFLICT DO NOTHING``) and ``RETURNING`` work as with a
+plain INSERT.  The staging table lives for the session, is emptied on
+commit and is truncated before every load, so loads can repeat inside one
+transaction.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+from typing import Iterable, Optional, Sequence
+
+
+def _copy_value(value) -> str:
+    """One field in COPY text format."""
+    if value is None:
+        return r"\N"
+    text = str(value)
+    if "\\" in text or "\t" in text or "\n" in text or "\r" in text:
+        text = (text.replace("\\", "\\\\").replace("\t", "\\t")
+                    .replace("\n", "\\n").replace("\r", "\\r"))
+    return text
+
+
+class CopyStream(io.TextIOBase):
+    """File-like view of ``rows`` as COPY text, produced as it is read."""
+
+    def __init__(self, rows: Iterable[Sequence], lines_per_read: int = 1000):
+        self._rows = iter(rows)
+        self._lines_per_read = lines_per_read
+        self._buffer = ""
+        self.rows = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self) -> bool:
+        lines = []
+        for row in self._rows:
+            lines.append("\t".join(map(_copy_value, row)) + "\n")
+            if len(lines) >= self._lines_per_read:
+                break
+        self.rows += len(lines)
+        self._buffer += "".join(lines)
+        return bool(lines)
+
+    def read(self, size: int = -1) -> str:
+        while (size is None or size < 0 or len(self._buffer) < size) and self._fill():
+            pass
+        if size is None or size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def staging_table(cur, table: str, columns: Sequence[str]) -> str:
+    """Create (once per session) and empty the staging table for these columns."""
+    cols = ", ".join(columns)
+    name = f"stage_{table}_{hashlib.md5(cols.encode()).hexdigest()[:8]}"
+    cur.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {name} ON COMMIT DELETE ROWS AS "
+        f"SELECT {cols} FROM {table} WITH NO DATA;"
+    )
+    cur.execute(f"TRUNCATE {name};")
+    return name
+
+
+def bulk_insert(cur, table: str, columns: Sequence[str], rows: Iterable[Sequence],
+                on_conflict: str = "", returning: Optional[str] = None):
+    """
+    Insert ``rows`` (tuples in ``columns`` order) into ``table`` through
+    COPY + one INSERT ... SELECT.
+
+    :param on_conflict: e.g. ``"ON CONFLICT DO NOTHING"``
+    :param returning:   column list to return; the rows are then returned
+    :return: the RETURNING rows, or the number of rows inserted
+    """
+    cols = ", ".join(columns)
+    staging = staging_table(cur, table, columns)
+    cur.copy_expert(f"COPY {staging} ({cols}) FROM STDIN", CopyStream(rows))
+    cur.execute(
+        f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {staging} {on_conflict}"
+        + (f" RETURNING {returning};" if returning else ";")
+    )
+    if returning:
+        return cur.fetchall()
+    return cur.rowcount
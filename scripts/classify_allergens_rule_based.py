@@ -7,7 +7,12 @@ Improved rule-based classifier:
 * multi-word keywords handled robustly
 * punctuation / dash tolerant
 * optional plural “s” automatically allowed
-* false-positive guard integration
+* false-positive guard phrases (``config/false_positive_guard.json``)
+  suppress the keyword hits they cover, in the same scan
+* the whole dictionary compiled into one pattern (``AllergenMatcher``):
+  every allergen of an ingredient is found in a single regex pass
+* each distinct ingredient string classified once per dictionary version
+  (``scripts/allergen_cache.py``)
 """
 
 from __future__ import annotations
@@ -16,11 +21,17 @@ import sys
 import json
 import re
 from pathlib import Path
-import psycopg2
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT_DIR))
-from scripts.false_positive_guard import is_false_positive 
+from scrapers import db_pool
+from scripts.allergen_cache import AllergenCache, ensure_cache_table, version_digest
+from scripts.bulk_load import bulk_insert
+from scripts.db_stream import iter_chunks
+from scripts.false_positive_guard import load_guard
+from scripts.pipeline_progress import (
+    CLEAN_STAGE, RULE_STAGE, ensure_progress_table, changed_recipe_ids, mark_processed,
+)
 
 # --------------------------------------------------------------------------- #
 DB_URL     = os.getenv(
@@ -30,6 +41,8 @@ DB_URL     = os.getenv(
 DICT_PATH  = ROOT_DIR / "config" / "allergen_dict.json"
 # --------------------------------------------------------------------------- #
 
+TAG_COLUMNS = ("ingredient_id", "recipe_id", "allergen")
+
 
 def compile_dictionary(raw: dict[str, list[str]]) -> dict[str, list[re.Pattern]]:
     """
@@ -49,19 +62,95 @@ def compile_dictionary(raw: dict[str, list[str]]) -> dict[str, list[re.Pattern]]
     return bucket
 
 
-def main() -> None:
-    print(f"[DB] Connecting to {DB_URL}")
-    conn = psycopg2.connect(DB_URL)
-    cur  = conn.cursor()
+def _keyword_units(kw: str) -> tuple[list[str], str]:
+    """``compile_dictionary``'s keyword regex as trie units + its ending."""
+    parts = kw.lower().split()
+    units: list[str] = []
+    for i, part in enumerate(parts):
+        if i:
+            units.append(r"\W*")
+        units.extend(re.escape(ch) for ch in part)
+    return units, (r"\b" if "".join(parts).endswith("s") else r"s?\b")
+
+
+def trie_regex(keywords) -> str:
+    """
+    One regex matching exactly what any of the keyword regexes matches at
+    a given position, with shared prefixes factored out so the engine
+    does not try every keyword in turn.
+    """
+    root: dict = {}
+    for kw in keywords:
+        units, end = _keyword_units(kw)
+        node = root
+        for unit in units:
+            node = node.setdefault(unit, {})
+        node.setdefault(None, set()).add(end)
+
+    def render(node) -> str:
+        branches = [unit + render(child)
+                    for unit, child in sorted((k, v) for k, v in node.items() if k is not None)]
+        ends = node.get(None, ())
+        if r"s?\b" in ends:
+            branches.append(r"s?\b")
+        elif ends:
+            branches.append(r"\b")
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return render(root) if root else "(?!)"
+
+
+class AllergenMatcher:
+    """
+    All allergens whose keywords occur in a text, in dictionary order – the
+    same answer as trying every regex of ``compile_dictionary``, from one
+    scan.  The pattern stops only at word starts where some keyword or
+    guard phrase matches; there one lookahead group per allergen captures
+    the span its keywords match from that position, and one per guarded
+    allergen the span of its guard phrase.  A hit lying inside a guard span
+    of the same allergen ("milk" in "coconut milk") does not count.
+    """
 
+    def __init__(self, raw: dict[str, list[str]], guard: dict[str, list[str]] | None = None):
+        guard = {a: pats for a, pats in (guard or {}).items() if a in raw and pats}
+        self.allergens = list(raw)
+        self.version = version_digest(json.dumps([raw, guard], sort_keys=True))
+
+        groups, gates = [], [trie_regex([kw for keywords in raw.values() for kw in keywords])]
+        self._slots: list[tuple[int, bool]] = []
+        for i, (allergen, keywords) in enumerate(raw.items()):
+            groups.append(rf"(?:(?=({trie_regex(keywords)})))?")
+            self._slots.append((i, False))
+            if allergen in guard:
+                phrases = "|".join(guard[allergen])
+                gates.append(phrases)
+                groups.append(rf"(?:(?=({phrases})))?")
+                self._slots.append((i, True))
+        self.pattern = re.compile(rf"\b(?={'|'.join(gates)}){''.join(groups)}", re.I)
+
+    def match(self, text: str) -> list[str]:
+        hits: dict[int, list[tuple[int, int]]] = {}
+        guarded: dict[int, list[tuple[int, int]]] = {}
+        for m in self.pattern.finditer(text):
+            for g, found in enumerate(m.groups(), 1):
+                if found is not None:
+                    i, is_guard = self._slots[g - 1]
+                    (guarded if is_guard else hits).setdefault(i, []).append(m.span(g))
+        return [
+            self.allergens[i] for i in sorted(hits)
+            if any(not any(gs <= s and e <= ge for gs, ge in guarded.get(i, ()))
+                   for s, e in hits[i])
+        ]
+
+
+def load_dictionary() -> AllergenMatcher:
     if not DICT_PATH.exists():
         sys.exit(f"[ERR] missing dictionary: {DICT_PATH}")
     with DICT_PATH.open(encoding="utf-8") as fh:
-        dict_raw = json.load(fh)
-    dict_rgx = compile_dictionary(dict_raw)
-    print("[OK] Loaded allergen dictionary")
+        return AllergenMatcher(json.load(fh), load_guard())
 
-    # ensure target table
+
+def ensure_allergen_table(cur) -> None:
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS ingredient_allergens (
@@ -75,37 +164,68 @@ def main() -> None:
         );
         """
     )
-    conn.commit()
 
-    # fetch every processed ingredient
-    cur.execute("SELECT id, recipe_id, ingredient FROM processed_ingredients;")
-    rows = cur.fetchall()
-    print(f"[OK] {len(rows)} ingredients to scan")
 
-    results: list[tuple[int, int, str]] = []
+def tag_ingredients(rows, matcher: AllergenMatcher, cache: AllergenCache | None = None,
+                    cur=None) -> list[tuple[int, int, str]]:
+    """
+    ``(ingredient_id, recipe_id, allergen)`` for every dictionary hit in
+    ``rows``, matching each distinct ingredient string once.
+    """
+    cache = cache or AllergenCache(RULE_STAGE, matcher.version)
+    return cache.tag(rows, lambda texts: [matcher.match(t.lower()) for t in texts], cur)
+
+
+def insert_tags(cur, tags) -> int:
+    """Bulk-insert ``(ingredient_id, recipe_id, allergen)`` rows, skipping existing tags."""
+    return bulk_insert(cur, "ingredient_allergens", TAG_COLUMNS, tags,
+                       on_conflict="ON CONFLICT DO NOTHING")
+
+
+def main(changed_only: bool = False) -> None:
+    """
+    Tag every processed ingredient, or with ``changed_only`` just those of
+    recipes re-cleaned since this stage last ran.
+    """
+    print(f"[DB] Connecting to {DB_URL}")
+    conn = db_pool.connect(DB_URL)
+    cur  = conn.cursor()
 
-    for ing_id, recipe_id, txt in rows:
-        text = txt or ""
-        lower = text.lower()
+    matcher = load_dictionary()
+    print("[OK] Loaded allergen dictionary")
 
-        for allergen, regex_list in dict_rgx.items():
-            if any(rgx.search(lower) for rgx in regex_list):
-                if not is_false_positive(allergen, lower):
-                    results.append((ing_id, recipe_id, allergen))
+    # ensure target table
+    ensure_allergen_table(cur)
+    ensure_cache_table(cur)
+    ensure_progress_table(cur)
+    conn.commit()
 
-    print(f"[OK] {len(results)} tags identified")
+    recipe_ids = None
+    if changed_only:
+        recipe_ids = changed_recipe_ids(cur, RULE_STAGE, upstream=CLEAN_STAGE)
+        print(f"[OK] {len(recipe_ids)} recipes changed since last pass")
 
-    if results:
-        cur.executemany(
-            """
-            INSERT INTO ingredient_allergens (ingredient_id, recipe_id, allergen)
-            VALUES (%s, %s, %s)
-            ON CONFLICT DO NOTHING;
-            """,
-            results,
-        )
-        conn.commit()
-        print("[DB] Tags inserted")
+    # stream the ingredients chunk by chunk, tagging each before the next
+    cache = AllergenCache(RULE_STAGE, matcher.version)
+    scanned = tagged = 0
+    for rows in iter_chunks(
+        conn, "rule_based_stream",
+        """
+        SELECT id, recipe_id, ingredient FROM processed_ingredients
+        WHERE %s::int[] IS NULL OR recipe_id = ANY(%s::int[]);
+        """,
+        (recipe_ids, recipe_ids),
+    ):
+        results = tag_ingredients(rows, matcher, cache, cur)
+        if results:
+            insert_tags(cur, results)
+        scanned += len(rows)
+        tagged += len(results)
+    print(f"[OK] {scanned} ingredients scanned ({cache.classified} distinct strings "
+          f"matched, the rest cached), {tagged} tags inserted")
+
+    mark_processed(cur, RULE_STAGE, recipe_ids, upstream=CLEAN_STAGE)
+    conn.commit()
 
     cur.close()
     conn.close()
@@ -113,4 +233,4 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    main(changed_only="--changed-only" in sys.argv)
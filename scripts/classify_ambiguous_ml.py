@@ -4,20 +4,20 @@ classify_ambiguous_ml.py
 ------------------------
 
 Small ML module that predicts allergens for *still-untagged* ingredients.
+Each distinct ingredient string is predicted once per model version
+(``scripts/allergen_cache.py``).
+
+Training (sklearn) saves the pipeline and exports a NumPy-only copy
+(``scripts/compact_model.py``) that classification loads instead, so the
+stage never imports sklearn or pandas.  ``--export`` converts a pickle
+trained before the export existed.
 """
 
 from __future__ import annotations
 import os
 import sys
-import joblib
-import psycopg2
 import numpy as np
-import pandas as pd
 from pathlib import Path
-from sklearn.pipeline import Pipeline
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.multiclass import OneVsRestClassifier
 
 # --------------------------------------------------------------------------- #
 ROOT_DIR   = Path(__file__).resolve().parents[1]
@@ -28,16 +28,34 @@ DB_URL     = os.getenv(
 TRAIN_CSV  = ROOT_DIR / "data" / "ambiguous_train.csv"
 MODEL_DIR  = ROOT_DIR / "models"
 MODEL_PATH = MODEL_DIR / "allergen_classifier.pkl"
+COMPACT_PATH = MODEL_DIR / "allergen_classifier"
+THRESHOLD  = 0.30
+INFER_BATCH = 4096      # texts vectorised + predicted per predict_proba call
 # --------------------------------------------------------------------------- #
 
 sys.path.append(str(ROOT_DIR))
-from scripts.false_positive_guard import is_false_positive  # noqa: E402
+from scrapers import db_pool  # noqa: E402
+from scripts.allergen_cache import AllergenCache, ensure_cache_table, version_digest  # noqa: E402
+from scripts.classify_allergens_rule_based import insert_tags  # noqa: E402
+from scripts.compact_model import CompactModel, export_model  # noqa: E402
+from scripts.db_stream import iter_chunks  # noqa: E402
+from scripts.false_positive_guard import GUARD_PATH, is_false_positive  # noqa: E402
+from scripts.pipeline_progress import (  # noqa: E402
+    RULE_STAGE, ML_STAGE, ensure_progress_table, changed_recipe_ids, mark_processed,
+)
 
 
 # ╭──────────────────────────────────────────────────────────────────────────╮
 # │ TRAINING                                                                │
 # ╰──────────────────────────────────────────────────────────────────────────╯
 def train_model() -> None:
+    import joblib
+    import pandas as pd
+    from sklearn.pipeline import Pipeline
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.multiclass import OneVsRestClassifier
+
     if not TRAIN_CSV.exists():
         sys.exit(f"[ERR] Training file missing: {TRAIN_CSV}")
 
@@ -67,60 +85,126 @@ def train_model() -> None:
     MODEL_DIR.mkdir(exist_ok=True)
     joblib.dump((pipe, vocab), MODEL_PATH)
     print(f"[TRAIN] model saved → {MODEL_PATH}")
+    export_model(pipe, vocab, COMPACT_PATH)
+    print(f"[TRAIN] inference arrays exported → {COMPACT_PATH}")
+
+
+def export_trained() -> None:
+    """Export the compact inference copy of an already trained pickle."""
+    import joblib
+
+    if not MODEL_PATH.exists():
+        sys.exit("[ERR] Model not found – run with --train first")
+    pipe, vocab = joblib.load(MODEL_PATH)
+    export_model(pipe, vocab, COMPACT_PATH)
+    print(f"[EXPORT] inference arrays exported → {COMPACT_PATH}")
 
 
 # ╭──────────────────────────────────────────────────────────────────────────╮
 # │ CLASSIFICATION                                                          │
 # ╰──────────────────────────────────────────────────────────────────────────╯
-def classify_untagged(threshold: float = 0.30) -> None:
+def load_model():
+    """
+    ``(model, vocab)`` – the memory-mapped compact export, else the pickled
+    sklearn pipeline – or None before the model has been trained.
+    """
+    if (COMPACT_PATH / "meta.json").exists():
+        model = CompactModel(COMPACT_PATH)
+        return model, model.labels
     if not MODEL_PATH.exists():
-        sys.exit("[ERR] Model not found – run with --train first")
+        return None
+    import joblib
+    return joblib.load(MODEL_PATH)
+
+
+def model_version(threshold: float = THRESHOLD) -> str:
+    """Cache version of the trained model's predictions at ``threshold``."""
+    meta = COMPACT_PATH / "meta.json"
+    source = meta.read_bytes() if meta.exists() else MODEL_PATH.read_bytes()
+    guard = GUARD_PATH.read_bytes() if GUARD_PATH.exists() else b""
+    return version_digest(source, threshold, guard)
+
+
+def predict_allergens(model, texts, threshold: float = THRESHOLD,
+                      batch_size: int = INFER_BATCH) -> list[list[str]]:
+    """
+    Allergens predicted for each of ``texts``, false positives removed.
+    Texts are vectorised and predicted ``batch_size`` at a time, so the
+    sparse features and dense probabilities never exceed one batch, and the
+    threshold is applied to a whole batch at once.
+    """
+    pipe, vocab = model
+    results: list[list[str]] = [[] for _ in texts]
+
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        probs = pipe.predict_proba(batch)
+        rows, cols = np.nonzero(probs >= threshold)
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            allergen = vocab[col]
+            if not is_false_positive(allergen, batch[row]):
+                results[start + row].append(allergen)
+    return results
+
+
+def predict_tags(model, rows, threshold: float = THRESHOLD,
+                 cache: AllergenCache | None = None, cur=None) -> list[tuple[int, int, str]]:
+    """
+    ``(ingredient_id, recipe_id, allergen)`` predicted for untagged ``rows``,
+    each distinct ingredient string predicted once.
+    """
+    if not rows:
+        return []
+    cache = cache or AllergenCache(ML_STAGE, model_version(threshold))
+    return cache.tag(rows, lambda texts: predict_allergens(model, texts, threshold), cur)
 
-    pipe, vocab = joblib.load(MODEL_PATH)
+
+def classify_untagged(threshold: float = THRESHOLD, changed_only: bool = False) -> None:
+    model = load_model()
+    if model is None:
+        sys.exit("[ERR] Model not found – run with --train first")
     print("[CLASSIFY] model loaded.")
 
-    conn = psycopg2.connect(DB_URL)
+    conn = db_pool.connect(DB_URL)
     cur  = conn.cursor()
 
-    cur.execute(
+    ensure_cache_table(cur)
+    ensure_progress_table(cur)
+    recipe_ids = None
+    if changed_only:
+        recipe_ids = changed_recipe_ids(cur, ML_STAGE, upstream=RULE_STAGE)
+        print(f"[CLASSIFY] {len(recipe_ids)} recipes changed since last pass")
+
+    # untagged ingredients, predicted and written one chunk at a time; the
+    # cursor's snapshot does not see the tags inserted meanwhile
+    cache = AllergenCache(ML_STAGE, model_version(threshold))
+    scanned = tagged = 0
+    for rows in iter_chunks(
+        conn, "ml_untagged_stream",
         """
         SELECT pi.id, pi.recipe_id, pi.ingredient
         FROM processed_ingredients pi
         LEFT JOIN ingredient_allergens ia
           ON pi.id = ia.ingredient_id
-        WHERE ia.ingredient_id IS NULL;
-        """
-    )
-    rows = cur.fetchall()
-    if not rows:
+        WHERE ia.ingredient_id IS NULL
+          AND (%s::int[] IS NULL OR pi.recipe_id = ANY(%s::int[]));
+        """,
+        (recipe_ids, recipe_ids),
+    ):
+        inserts = predict_tags(model, rows, threshold, cache, cur)
+        if inserts:
+            insert_tags(cur, inserts)
+        scanned += len(rows)
+        tagged += len(inserts)
+
+    if scanned:
+        print(f"[CLASSIFY] {scanned} untagged ingredients ({cache.classified} distinct "
+              f"strings predicted, the rest cached), {tagged} new tags")
+    else:
         print("[CLASSIFY] nothing to tag")
-        cur.close(); conn.close(); return
-
-    texts  = [r[2] or "" for r in rows]
-    pairs  = [(r[0], r[1]) for r in rows]
-    probs  = pipe.predict_proba(texts)
-
-    inserts: list[tuple[int, int, str]] = []
-    for (ing_id, recipe_id), prob_vec, raw_txt in zip(pairs, probs, texts):
-        for idx, p in enumerate(prob_vec):
-            if p >= threshold:
-                allergen = vocab[idx]
-                if not is_false_positive(allergen, raw_txt):
-                    inserts.append((ing_id, recipe_id, allergen))
-
-    print(f"[CLASSIFY] {len(inserts)} new tags")
-
-    if inserts:
-        cur.executemany(
-            """
-            INSERT INTO ingredient_allergens (ingredient_id, recipe_id, allergen)
-            VALUES (%s, %s, %s)
-            ON CONFLICT DO NOTHING;
-            """,
-            inserts,
-        )
-        conn.commit()
-        print("[CLASSIFY] DB updated")
+
+    mark_processed(cur, ML_STAGE, recipe_ids, upstream=RULE_STAGE)
+    conn.commit()
 
     cur.close(); conn.close()
     print("[DONE]")
@@ -129,8 +213,10 @@ def classify_untagged(threshold: float = 0.30) -> None:
 def main() -> None:
     if len(sys.argv) > 1 and sys.argv[1] == "--train":
         train_model()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--export":
+        export_trained()
     else:
-        classify_untagged()
+        classify_untagged(changed_only="--changed-only" in sys.argv)
 
 
 if __name__ == "__main__":
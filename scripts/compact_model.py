@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""
+compact_model.py
+----------------
+
+NumPy-only inference artifact for the ambiguous-ingredient classifier.
+
+``export_model`` takes the trained sklearn pipeline (``TfidfVectorizer`` +
+``OneVsRestClassifier(LogisticRegression)``) and writes a directory of
+plain arrays:
+
+* ``terms.npy``     – the vocabulary as a sorted unicode array
+* ``idf.npy``       – IDF weight per term
+* ``coef.npy``      – one coefficient column per label, ``(terms, labels)``
+* ``intercept.npy`` – one intercept per label
+* ``meta.json``     – labels, tokeniser settings and a content version
+
+``CompactModel`` loads them (memory-mapped by default, so processes
+loading the same artifact share its pages) and reproduces the pipeline's
+``predict_proba`` with NumPy alone – no sklearn, pandas or joblib import
+and no vocabulary dict at inference time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+
+ARRAYS = ("terms", "idf", "coef", "intercept")
+
+
+def export_model(pipe, labels, path: Path) -> Path:
+    """Write ``pipe``'s inference arrays + metadata to the directory ``path``."""
+    tfidf, clf = pipe.named_steps["tfidf"], pipe.named_steps["clf"]
+    if (tfidf.analyzer != "word" or tfidf.tokenizer or tfidf.preprocessor
+            or tfidf.stop_words or tfidf.strip_accents or tfidf.binary
+            or tfidf.norm not in ("l2", None)):
+        raise ValueError("export supports word n-gram TfidfVectorizer settings only")
+
+    order = sorted(tfidf.vocabulary_, key=tfidf.vocabulary_.get)
+    terms = np.array(order)
+    perm = np.argsort(terms)
+    idf = tfidf.idf_ if tfidf.use_idf else np.ones(len(order))
+
+    coef = np.zeros((len(order), len(clf.estimators_)))
+    intercept = np.zeros(len(clf.estimators_))
+    for j, est in enumerate(clf.estimators_):
+        if hasattr(est, "coef_"):
+            coef[:, j] = est.coef_[0]
+            intercept[j] = est.intercept_[0]
+        else:
+            # label constant in the training data: always 0 or always 1
+            intercept[j] = np.inf if est.y_[0] else -np.inf
+
+    arrays = {
+        "terms": terms[perm],
+        "idf": np.ascontiguousarray(idf[perm], dtype=np.float64),
+        "coef": np.ascontiguousarray(coef[perm]),
+        "intercept": intercept,
+    }
+    path.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.md5()
+    for name in ARRAYS:
+        np.save(path / f"{name}.npy", arrays[name])
+        digest.update(arrays[name].tobytes())
+
+    meta = {
+        "labels": list(labels),
+        "lowercase": tfidf.lowercase,
+        "token_pattern": tfidf.token_pattern,
+        "ngram_range": list(tfidf.ngram_range),
+        "sublinear_tf": tfidf.sublinear_tf,
+        "norm": tfidf.norm,
+        "normalize_rows": not clf.multilabel_,
+    }
+    digest.update(json.dumps(meta, sort_keys=True).encode("utf-8"))
+    meta["version"] = digest.hexdigest()[:16]
+    (path / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return path
+
+
+class CompactModel:
+    """``predict_proba`` of an exported pipeline, from its arrays."""
+
+    def __init__(self, path: Path, mmap: bool = True):
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        mode = "r" if mmap else None
+        for name in ARRAYS:
+            setattr(self, name, np.load(path / f"{name}.npy", mmap_mode=mode))
+        self.labels: list[str] = meta["labels"]
+        self.version: str = meta["version"]
+        self._lowercase = meta["lowercase"]
+        self._token = re.compile(meta["token_pattern"])
+        self._min_n, self._max_n = meta["ngram_range"]
+        self._sublinear = meta["sublinear_tf"]
+        self._norm = meta["norm"]
+        self._normalize_rows = meta["normalize_rows"]
+
+    def _ngrams(self, text: str) -> list[str]:
+        tokens = self._token.findall(text.lower() if self._lowercase else text)
+        grams = []
+        for n in range(self._min_n, self._max_n + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def predict_proba(self, texts) -> np.ndarray:
+        """``(len(texts), labels)`` probabilities, as the sklearn pipeline gives them."""
+        rows, grams = [], []
+        for i, text in enumerate(texts):
+            found = self._ngrams(text)
+            grams.extend(found)
+            rows.extend([i] * len(found))
+
+        # vocabulary lookup: binary search in the sorted term array
+        n_terms = len(self.terms)
+        queries = np.array(grams) if grams else self.terms[:0]
+        pos = np.minimum(np.searchsorted(self.terms, queries), n_terms - 1)
+        known = self.terms[pos] == queries
+        rows, cols = np.asarray(rows, dtype=np.intp)[known], pos[known]
+
+        # term counts per (text, term), then tf-idf weights
+        keys, counts = np.unique(rows * n_terms + cols, return_counts=True)
+        rows, cols = keys // n_terms, keys % n_terms
+        tf = counts.astype(np.float64)
+        if self._sublinear:
+            tf = np.log(tf) + 1.0
+        weights = tf * self.idf[cols]
+        if self._norm == "l2":
+            norms = np.sqrt(np.bincount(rows, weights * weights, minlength=len(texts)))
+            weights /= norms[rows]
+
+        decision = np.tile(self.intercept, (len(texts), 1))
+        if len(rows):
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            decision[rows[starts]] += np.add.reduceat(weights[:, None] * self.coef[cols], starts)
+        with np.errstate(over="ignore"):
+            probs = 1.0 / (1.0 + np.exp(-decision))
+        if self._normalize_rows:
+            probs /= probs.sum(axis=1)[:, None]
+        return probs
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+"""
+db_stream.py
+------------
+
+Chunked reads through named (server-side) cursors, so a stage holds one
+chunk of a table in memory instead of the whole result of ``fetchall()``.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+CHUNK_ROWS = 5000
+
+
+def iter_chunks(conn, name: str, sql: str, params=None, size: int = CHUNK_ROWS,
+                withhold: bool = False) -> Iterator[list[tuple]]:
+    """
+    Yield lists of up to ``size`` rows of ``sql``.  Pass ``withhold=True``
+    when the caller commits between chunks (the cursor then survives the
+    commit, as in ``BaseRecipeScraper.reparse``).
+    """
+    stream = conn.cursor(name=name, withhold=withhold)
+    stream.itersize = size
+    try:
+        stream.execute(sql, params)
+        while True:
+            rows = stream.fetchmany(size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        stream.close()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+pipeline_progress.py
+--------------------
+
+Per-stage digest watermarks for incremental runs.
+
+Every stage records, per recipe, the content digest it last processed.  A
+recipe needs (re)processing by a stage when that digest differs from the
+upstream one – ``clean_recipes.content_digest`` for the first stage, the
+upstream stage's recorded digest otherwise.
+"""
+
+from __future__ import annotations
+
+CLEAN_STAGE = "clean_ingredients"
+RULE_STAGE  = "rule_based"
+ML_STAGE    = "ml"
+
+
+def ensure_progress_table(cur) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pipeline_progress (
+            stage        TEXT    NOT NULL,
+            recipe_id    INTEGER NOT NULL REFERENCES clean_recipes(id) ON DELETE CASCADE,
+            digest       TEXT,
+            processed_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (stage, recipe_id)
+        );
+        """
+    )
+
+
+def changed_recipe_ids(cur, stage: str, upstream: str | None = None) -> list[int]:
+    """Recipe ids whose upstream digest differs from what ``stage`` last saw."""
+    if upstream is None:
+        cur.execute(
+            """
+            SELECT cr.id
+            FROM clean_recipes cr
+            LEFT JOIN pipeline_progress pp
+              ON pp.stage = %s AND pp.recipe_id = cr.id
+            WHERE pp.recipe_id IS NULL
+               OR pp.digest IS DISTINCT FROM cr.content_digest;
+            """,
+            (stage,),
+        )
+    else:
+        cur.execute(
+            """
+            SELECT up.recipe_id
+            FROM pipeline_progress up
+            LEFT JOIN pipeline_progress pp
+              ON pp.stage = %s AND pp.recipe_id = up.recipe_id
+            WHERE up.stage = %s
+              AND (pp.recipe_id IS NULL OR pp.digest IS DISTINCT FROM up.digest);
+            """,
+            (stage, upstream),
+        )
+    return [r[0] for r in cur.fetchall()]
+
+
+def mark_processed(cur, stage: str, recipe_ids: list[int] | None,
+                   upstream: str | None = None) -> None:
+    """
+    Record the upstream digest as processed by ``stage``.
+    ``recipe_ids=None`` marks every recipe the upstream knows about.
+    """
+    if upstream is None:
+        source = "SELECT %s, cr.id, cr.content_digest FROM clean_recipes cr"
+        where, params = " WHERE cr.id = ANY(%s)", [stage]
+    else:
+        source = ("SELECT %s, up.recipe_id, up.digest FROM pipeline_progress up"
+                  " WHERE up.stage = %s")
+        where, params = " AND up.recipe_id = ANY(%s)", [stage, upstream]
+    if recipe_ids is not None:
+        source += where
+        params.append(list(recipe_ids))
+    cur.execute(
+        f"""
+        INSERT INTO pipeline_progress (stage, recipe_id, digest, processed_at)
+        {source}
+        ON CONFLICT (stage, recipe_id) DO UPDATE
+           SET digest       = EXCLUDED.digest,
+               processed_at = NOW();
+        """,
+        params,
+    )
+
+
+def reset_progress(cur, stages: list[str] | None = None) -> None:
+    """Forget the watermarks of ``stages`` (all stages when ``None``)."""
+    if stages is None:
+        cur.execute("DELETE FROM pipeline_progress;")
+    else:
+        cur.execute("DELETE FROM pipeline_progress WHERE stage = ANY(%s);", (list(stages),))
@@ -20,14 +20,7 @@ LOG_FILE="$LOG_DIR/pipeline_$(date +%F_%H-%M-%S).log"
 exec > >(tee -a "$LOG_FILE") 2>&1
 echo "==== $(date)  Pipeline started ===="
 
-python scrapers/allergicliving_scraper.py
-python scrapers/fandom_scraper.py
-python scrapers/fare_scraper.py
-python scrapers/foodista_scraper.py
-python scrapers/theallergenfreekitchen_scraper.py
-python scrapers/theprettybee_scraper.py
-python scripts/clean_ingredients.py
-python scripts/classify_allergens_rule_based.py
-python scripts/classify_ambiguous_ml.py
+# All sites concurrently, then clean → rule-based → ML (changed recipes only)
+python scripts/run_pipeline.py "$@"
 
 echo "==== $(date)  Pipeline finished ===="
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+"""
+run_pipeline.py
+---------------
+
+Run the whole pipeline from one Python process:
+
+  1. every site in ``config/*.json`` is scraped concurrently (one thread per
+     site – they hit different hosts, and each scraper already limits its
+     own per-host rate); a failing site is reported but does not stop the
+     others
+  2. then, in order, each depending on the previous one:
+     clean_ingredients → classify_allergens_rule_based → classify_ambiguous_ml
+     (incremental ``--changed-only`` runs unless ``--full`` is given)
+
+With ``--reparse`` step 1 re-parses every site's stored HTML instead of
+scraping it (no network; one site at a time, since each re-parse already
+runs one parser process per core).
+
+Scrapers and stages borrow their connections from the shared pool in
+``scrapers/db_pool.py`` (``DB_POOL_SIZE``), so the run never holds more
+than that many Postgres connections per database URL.
+
+Ends with a timing summary per site and per stage.  Exit status is 1 if
+anything failed.
+
+    python scripts/run_pipeline.py
+    python scripts/run_pipeline.py --sites fare,foodista --skip-stages
+    python scripts/run_pipeline.py --skip-scrape --full
+    python scripts/run_pipeline.py --time-budget 900 --skip-stages   # cron time slice
+    python scripts/run_pipeline.py --reparse                         # after a selector change
+"""
+
+import argparse
+import json
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+CONFIG_DIR = ROOT_DIR / "config"
+
+
+@dataclass
+class StageResult:
+    name: str
+    seconds: float
+    ok: bool
+    error: str = ""
+
+
+def load_site_configs(only=None):
+    """Site configs from config/*.json (files without start_urls are skipped)."""
+    configs = []
+    for path in sorted(CONFIG_DIR.glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        if not isinstance(config, dict) or not config.get("start_urls"):
+            continue
+        if only and path.stem not in only and config.get("site_name") not in only:
+            continue
+        configs.append(config)
+    return configs
+
+
+def timed(name, func, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        func(*args, **kwargs)
+        return StageResult(name, time.perf_counter() - start, True)
+    except (Exception, SystemExit) as e:  # a stage calling sys.exit() failed too
+        traceback.print_exc()
+        return StageResult(name, time.perf_counter() - start, False, f"{type(e).__name__}: {e}")
+
+
+def scrape_site(config, full_crawl=None, time_budget=None):
+    from scrapers.base_scraper import BaseRecipeScraper
+    BaseRecipeScraper(config).run(full_crawl=full_crawl, time_budget=time_budget)
+
+
+def scrape_all(configs, max_sites=None, full_crawl=None, time_budget=None):
+    """Scrape every site concurrently; returns one StageResult per site."""
+    if not configs:
+        return []
+    results = []
+    with ThreadPoolExecutor(max_workers=max_sites or len(configs),
+                            thread_name_prefix="site") as pool:
+        futures = {
+            pool.submit(timed, cfg.get("site_name", "UnknownSite"), scrape_site, cfg,
+                        full_crawl=full_crawl, time_budget=time_budget): cfg
+            for cfg in configs
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            status = "[OK]" if result.ok else "[ERROR]"
+            print(f"{status} scrape {result.name} finished in {result.seconds:.1f}s {result.error}")
+            results.append(result)
+    return results
+
+
+def reparse_site(config, workers=None):
+    from scrapers.base_scraper import BaseRecipeScraper
+    BaseRecipeScraper(config).reparse(workers=workers)
+
+
+def reparse_all(configs, workers=None):
+    """Re-parse every site's stored pages in turn; returns one StageResult per site."""
+    results = []
+    for cfg in configs:
+        result = timed(cfg.get("site_name", "UnknownSite"), reparse_site, cfg, workers=workers)
+        status = "[OK]" if result.ok else "[ERROR]"
+        print(f"{status} reparse {result.name} finished in {result.seconds:.1f}s {result.error}")
+        results.append(result)
+    return results
+
+
+def clean_stage(changed_only):
+    from scripts import clean_ingredients
+    clean_ingredients.main(changed_only=changed_only)
+
+
+def rule_stage(changed_only):
+    from scripts import classify_allergens_rule_based
+    classify_allergens_rule_based.main(changed_only=changed_only)
+
+
+def ml_stage(changed_only):
+    from scripts import classify_ambiguous_ml
+    classify_ambiguous_ml.classify_untagged(changed_only=changed_only)
+
+
+STAGES = [
+    ("clean_ingredients", clean_stage),
+    ("classify_allergens_rule_based", rule_stage),
+    ("classify_ambiguous_ml", ml_stage),
+]
+
+
+def run_stages(changed_only=True):
+    """Run the processing stages in order; a failed stage skips the rest."""
+    results = []
+    for name, func in STAGES:
+        if results and not results[-1].ok:
+            results.append(StageResult(name, 0.0, False, "skipped (upstream stage failed)"))
+            continue
+        print(f"==== {name} ====")
+        results.append(timed(name, func, changed_only))
+    return results
+
+
+def print_summary(site_results, stage_results, total):
+    print("\n==== Pipeline summary ====")
+    for title, results in (("Site", site_results), ("Stage", stage_results)):
+        for r in results:
+            status = "ok" if r.ok else "FAILED"
+            print(f"  {title:<6} {r.name:<32} {r.seconds:8.1f}s  {status} {r.error}")
+    print(f"  {'Total':<39} {total:8.1f}s")
+
+
+def main(sites=None, max_sites=None, scrape=True, stages=True, changed_only=True,
+         full_crawl=None, time_budget=None, reparse=False, parse_workers=None):
+    start = time.perf_counter()
+    site_results, stage_results = [], []
+
+    if reparse:
+        configs = load_site_configs(sites)
+        print(f"[INFO] Re-parsing stored pages of {len(configs)} sites")
+        site_results = reparse_all(configs, parse_workers)
+    elif scrape:
+        configs = load_site_configs(sites)
+        print(f"[INFO] Scraping {len(configs)} sites concurrently")
+        scrape_start = time.perf_counter()
+        site_results = scrape_all(configs, max_sites, full_crawl, time_budget)
+        print(f"[INFO] Scraping took {time.perf_counter() - scrape_start:.1f}s")
+
+    if stages:
+        stage_results = run_stages(changed_only)
+
+    from scrapers import db_pool
+    db_pool.close_all()
+    print_summary(site_results, stage_results, time.perf_counter() - start)
+    return all(r.ok for r in site_results + stage_results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape all sites concurrently, then run the processing stages.")
+    parser.add_argument("--sites", help="comma-separated config names or site names (default: all)")
+    parser.add_argument("--max-sites", type=int, help="sites scraped at the same time (default: all)")
+    parser.add_argument("--skip-scrape", action="store_true")
+    parser.add_argument("--skip-stages", action="store_true")
+    parser.add_argument("--full", action="store_true", help="reprocess every recipe, not only changed ones")
+    parser.add_argument("--full-crawl", action="store_true", help="ignore incremental crawl settings this run")
+    parser.add_argument("--time-budget", type=float,
+                        help="seconds each site may crawl; unfinished work resumes on the next run")
+    parser.add_argument("--reparse", action="store_true",
+                        help="re-parse stored HTML of every site instead of scraping")
+    parser.add_argument("--parse-workers",
+                        help='parser processes for --reparse (default "auto": one per core; 0 = inline)')
+    args = parser.parse_args()
+    ok = main(
+        sites=set(args.sites.split(",")) if args.sites else None,
+        max_sites=args.max_sites,
+        scrape=not args.skip_scrape,
+        stages=not args.skip_stages,
+        changed_only=not args.full,
+        full_crawl=True if args.full_crawl else None,
+        time_budget=args.time_budget,
+        reparse=args.reparse,
+        parse_workers=args.parse_workers,
+    )
+    sys.exit(0 if ok else 1)
@@ -40,3 +40,218 @@ def app():
 def client(app):
     """Reusable test client."""
     return app.test_client()
+
+
+# ------------------------------------------------------------------
+# 3) local stub HTTP server serving fixture HTML for scraper tests
+# ------------------------------------------------------------------
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_SITE = ROOT / "tests" / "fixtures" / "stub_site"
+
+
+class _StubHandler(SimpleHTTPRequestHandler):
+    """
+    Serves files from tests/fixtures/stub_site.
+
+    ``/flaky/<file>`` answers 503 on the first hit and the real file
+    afterwards, so the session's retry policy can be exercised;
+    ``/limited/<file>`` does the same with a 429 + ``Retry-After: 1``.
+    ``/robots.txt`` serves ``server.robots`` (404 when unset).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(FIXTURE_SITE), **kwargs)
+
+    def do_GET(self):
+        self.server.hits.append(self.path)
+        if self.path == "/robots.txt":
+            if self.server.robots is None:
+                self.send_error(404)
+            else:
+                body = self.server.robots.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            return
+        if self.path.startswith("/flaky/"):
+            if self.server.hits.count(self.path) == 1:
+                self.send_error(503)
+                return
+            self.path = self.path[len("/flaky"):]
+        if self.path.startswith("/limited/"):
+            if self.server.hits.count(self.path) == 1:
+                self.send_response(429)
+                self.send_header("Retry-After", "1")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.path = self.path[len("/limited"):]
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """Yield ``(base_url, server)``; ``server.hits`` lists requested paths."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.hits = []
+    server.robots = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", server
+    server.shutdown()
+    server.server_close()
+
+
+class FakeConnection:
+    """Just enough of a psycopg2 connection for scrapers that never hit SQL."""
+
+    encoding = "UTF8"
+
+    @property
+    def connection(self):
+        return self
+
+    def cursor(self, *args, **kwargs):
+        return self
+
+    def execute(self, *args, **kwargs):
+        pass
+
+    def mogrify(self, *args, **kwargs):
+        return b""
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class StateConnection(FakeConnection):
+    """Serves stored crawl_state rows and records every upserted row."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.written = []
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchall(self):
+        return self.rows
+
+    def mogrify(self, template, args):
+        self.written.append(args)
+        return b""
+
+    def status(self, url):
+        return [row[3] for row in self.written if row[0] == url][-1]
+
+
+@pytest.fixture
+def state_connection():
+    """Factory for a ``StateConnection`` serving the given crawl_state rows."""
+    return StateConnection
+
+
+@pytest.fixture
+def offline_db(monkeypatch):
+    """Patch ``psycopg2.connect`` so scrapers can be built without Postgres."""
+    import psycopg2
+    from scrapers import db_pool
+    monkeypatch.setattr(psycopg2, "connect", lambda *a, **kw: FakeConnection())
+    db_pool.close_all()
+    yield
+    db_pool.close_all()
+
+
+@pytest.fixture
+def recording_scraper():
+    """
+    Factory for a scraper that keeps saved recipes in ``scraper.saved``
+    instead of writing to Postgres (build it under ``offline_db``).
+    """
+    from scrapers.base_scraper import BaseRecipeScraper
+
+    class RecordingScraper(BaseRecipeScraper):
+        def __init__(self, config):
+            super().__init__(config)
+            self.saved = {}
+
+        def save_recipe(self, url, raw_html, parsed_data):
+            self.saved[url] = parsed_data
+            self._url_committed(url)
+
+        queue_recipe = save_recipe
+
+    return RecordingScraper
+
+
+@pytest.fixture
+def stub_config(stub_server):
+    """Factory for a site config pointing at the stub server's fixture pages."""
+    base_url, _ = stub_server
+
+    def make(**extra):
+        config = {
+            "site_name": "Stub Site",
+            "base_url": base_url,
+            "start_urls": [f"{base_url}/listing.html"],
+            "recipe_link_selector": "h2.recipe-title a",
+            "pagination_selector": None,
+            "title_selector": "h1.recipe-name",
+            "ingredients_selector": "ul.ingredients li",
+            "instructions_selector": "ol.steps li",
+            "tags_selector": "span.tag",
+            "use_selenium": False,
+        }
+        config.update(extra)
+        return config
+
+    return make
+
+
+# ------------------------------------------------------------------
+# 4) a real PostgreSQL for the tests that need one
+# ------------------------------------------------------------------
+@pytest.fixture
+def pg_connection():
+    """
+    psycopg2 connection to ``TEST_DATABASE_URL`` whose search_path is a
+    throw-away schema, dropped afterwards.  Skips the test when the
+    variable is unset or the server cannot be reached.
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    import psycopg2
+    try:
+        conn = psycopg2.connect(url, connect_timeout=3)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"PostgreSQL is not reachable: {e}")
+    cur = conn.cursor()
+    cur.execute("DROP SCHEMA IF EXISTS pytest_db CASCADE; CREATE SCHEMA pytest_db;"
+                " SET search_path TO pytest_db;")
+    conn.commit()
+    yield conn
+    conn.rollback()
+    cur.execute("DROP SCHEMA IF EXISTS pytest_db CASCADE;")
+    conn.commit()
+    conn.close()
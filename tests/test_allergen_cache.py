@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+from pathlib import Path
+
+from scripts.allergen_cache import AllergenCache
+from scripts.classify_allergens_rule_based import AllergenMatcher, tag_ingredients
+
+RAW = json.loads(
+    (Path(__file__).resolve().parents[1] / "config" / "allergen_dict.json").read_text(encoding="utf-8")
+)
+
+
+class CacheCursor:
+    """Cursor stand-in holding the allergen_cache table rows."""
+
+    def __init__(self, stored):
+        self.stored = stored
+        self.copied = []
+        self._result = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self._result = []
+        if sql.strip().startswith("SELECT ingredient, allergens FROM allergen_cache"):
+            classifier, version, texts = params
+            self._result = [(t, self.stored[(classifier, version, t)]) for t in texts
+                            if (classifier, version, t) in self.stored]
+
+    def copy_expert(self, sql, stream):
+        self.copied += [tuple(line.split("\t")) for line in stream.read().splitlines()]
+
+    def fetchall(self):
+        return self._result
+
+
+def test_each_distinct_string_classified_once():
+    calls = []
+
+    def classify(texts):
+        calls.append(list(texts))
+        return [["Milk"] if "milk" in t else [] for t in texts]
+
+    cache = AllergenCache("rule_based", "v1")
+    rows = [(1, 1, "milk"), (2, 1, "salt"), (3, 2, "milk"), (4, 3, None), (5, 3, "salt")]
+    assert cache.tag(rows, classify) == [(1, 1, "Milk"), (3, 2, "Milk")]
+    assert cache.tag([(6, 4, "milk"), (7, 4, "butter")], classify) == [(6, 4, "Milk")]
+    assert calls == [["milk", "salt", ""], ["butter"]]
+    assert cache.classified == 4
+
+
+def test_table_answers_reused_and_new_answers_stored():
+    cur = CacheCursor({("ml", "v1", "olive oil"): "", ("ml", "v1", "cream"): "Milk;Egg",
+                       ("ml", "v0", "salt"): "Sesame"})
+    seen = []
+
+    def classify(texts):
+        seen.extend(texts)
+        return [["Sesame"] if t == "tahini" else [] for t in texts]
+
+    cache = AllergenCache("ml", "v1")
+    tags = cache.tag([(1, 1, "cream"), (2, 1, "olive oil"), (3, 1, "salt"), (4, 2, "tahini")],
+                     classify, cur)
+
+    assert tags == [(1, 1, "Milk"), (1, 1, "Egg"), (4, 2, "Sesame")]
+    assert seen == ["salt", "tahini"]           # another version's answer is not used
+    assert cur.copied == [("salt", "ml", "v1", ""), ("tahini", "ml", "v1", "Sesame")]
+
+
+def test_rule_tags_unchanged_by_deduplication():
+    matcher = AllergenMatcher(RAW)
+    texts = ["milk", "peanut butter", "coconut milk", "all purpose flour", "salt", "milk", ""]
+    rows = [(i, i % 3, t) for i, t in enumerate(texts * 3)]
+    cache = AllergenCache("rule_based", matcher.version)
+
+    expected = [tag for row in rows for tag in tag_ingredients([row], matcher)]
+    assert tag_ingredients(rows, matcher, cache) == expected
+    assert cache.classified == len(set(texts))
+    assert AllergenMatcher({**RAW, "Milk": RAW["Milk"] + ["kefir"]}).version != matcher.version
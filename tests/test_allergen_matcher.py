@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import json
+from pathlib import Path
+
+from scripts.classify_allergens_rule_based import (
+    AllergenMatcher, compile_dictionary, tag_ingredients, trie_regex,
+)
+from scripts.clean_ingredients import normalize_ingredient
+from scripts.false_positive_guard import is_false_positive, load_guard
+
+ROOT = Path(__file__).resolve().parents[1]
+RAW = json.loads((ROOT / "config" / "allergen_dict.json").read_text(encoding="utf-8"))
+GUARD = load_guard()
+
+
+def per_keyword(compiled, lower):
+    """The original matching: every keyword regex of every allergen."""
+    return [allergen for allergen, regexes in compiled.items()
+            if any(rgx.search(lower) for rgx in regexes)]
+
+
+def evaluation_lines():
+    with open(ROOT / "data" / "evaluation_labels.csv", newline="", encoding="utf-8") as fh:
+        raw = [line.lower() for row in csv.DictReader(fh) for line in row["ingredients"].splitlines()]
+    return raw + [normalize_ingredient(line) for line in raw]
+
+
+def test_matches_per_keyword_regexes_on_evaluation_set():
+    matcher = AllergenMatcher(RAW)
+    compiled = compile_dictionary(RAW)
+    lines = evaluation_lines()
+    assert len(lines) > 500
+    for line in lines:
+        assert matcher.match(line) == per_keyword(compiled, line), line
+
+
+def test_plural_dash_and_word_boundaries():
+    raw = {"Peanuts": ["peanut butter", "peanut"], "Milk": ["butter", "milk"],
+           "Egg": ["egg"], "Sesame": ["sesame seeds"], "Empty": []}
+    matcher = AllergenMatcher(raw)
+    compiled = compile_dictionary(raw)
+    for text in ["peanut-butter cups", "peanutbutters", "2 eggs", "eggplant", "nutmeg",
+                 "sesame seeds", "sesame seedss", "buttermilk", "butter, milk", "peanut_butter",
+                 "", "milk milk eggs"]:
+        assert matcher.match(text) == per_keyword(compiled, text), text
+    # several allergens from the same start position
+    assert matcher.match("peanut butter") == ["Peanuts", "Milk"]
+
+
+def test_trie_regex_factors_shared_prefixes():
+    assert trie_regex(["egg", "eggs", "egg white"]) == r"egg(?:\W*whites?\b|s\b|s?\b)"
+    assert trie_regex([]) == "(?!)"
+
+
+def test_tag_ingredients_keeps_false_positive_guard():
+    matcher = AllergenMatcher(RAW, GUARD)
+    rows = [(1, 10, "Coconut milk"), (2, 10, "whole milk"), (3, 11, None)]
+    tags = tag_ingredients(rows, matcher)
+    assert (2, 10, "Milk") in tags
+    assert not any(t[0] == 1 and t[2] == "Milk" for t in tags)
+    assert not any(t[0] == 3 for t in tags)
+
+
+def test_guard_suppresses_only_the_hits_it_covers():
+    matcher = AllergenMatcher(RAW, GUARD)
+    assert "Milk" not in matcher.match("coconut milk")
+    assert "Milk" in matcher.match("coconut milk and butter")       # butter is not covered
+    assert "Milk" in matcher.match("butter or vegan butter")
+    assert "Milk" not in matcher.match("cocoa butter")
+    assert "Egg" not in matcher.match("plant-based egg")
+    assert "Gluten" not in matcher.match("gluten-free all purpose flour")
+    assert "Gluten" in matcher.match("wheat flour or gluten free flour")
+    # the guard covers the gluten-free phrase only, not later gluten hits
+    assert "Gluten" in matcher.match("gluten free pasta, barley malt")
+    assert "Gluten" in matcher.match("gluten free oats and wheat flour")
+    assert "Gluten" in matcher.match("gluten-free flour blend with rye")
+    assert "Gluten" not in matcher.match("rice flour")
+    assert matcher.match("almond milk") == ["Tree Nuts"]
+    # unguarded matcher still reports the raw hit
+    assert "Milk" in AllergenMatcher(RAW).match("coconut milk")
+
+
+def test_guard_rules_come_from_the_data_file():
+    extra = {**GUARD, "Soy": ["soy\\W*free(?:\\s+\\w+)?"]}
+    matcher = AllergenMatcher(RAW, extra)
+    assert "Soy" not in matcher.match("soy free tamari")
+    assert "Soy" in AllergenMatcher(RAW, GUARD).match("soy free tamari")
+    assert matcher.version != AllergenMatcher(RAW, GUARD).version
+    # whole-text check used for ML predictions reads the same file
+    assert is_false_positive("Milk", "Oat milk") and not is_false_positive("Milk", "whole milk")
+    assert not is_false_positive("Sesame", "coconut milk")
@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+
+import pytest
+
+from scrapers.async_fetch import AsyncFetchEngine
+
+
+def test_engine_bounds_in_flight_requests():
+    lock = threading.Lock()
+    state = {"now": 0, "peak": 0}
+
+    def slow_fetch(url):
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.05)
+        with lock:
+            state["now"] -= 1
+        return f"<html>{url}</html>"
+
+    engine = AsyncFetchEngine(slow_fetch, concurrency=3)
+    urls = [f"u{i}" for i in range(12)]
+    results = list(engine.iter_pages(urls))
+
+    assert sorted(r[0] for r in results) == sorted(urls)
+    assert all(err is None for _, _, err in results)
+    assert 1 < state["peak"] <= 3
+
+
+def test_engine_reports_errors_per_url():
+    def fetch(url):
+        if url == "bad":
+            raise RuntimeError("boom")
+        return "<html></html>"
+
+    results = {u: (h, e) for u, h, e in AsyncFetchEngine(fetch, 2).iter_pages(["ok", "bad"])}
+    assert results["ok"] == ("<html></html>", None)
+    assert results["bad"][0] is None
+    assert isinstance(results["bad"][1], RuntimeError)
+
+
+def test_link_iterator_error_reaches_the_caller_after_pages_in_flight():
+    release = threading.Event()
+
+    def fetch(url):
+        release.wait(timeout=2)
+        return "html"
+
+    def links():
+        yield "a"
+        yield "b"
+        release.set()
+        raise ValueError("frontier failed")
+
+    got = []
+    with pytest.raises(ValueError, match="frontier failed"):
+        for item in AsyncFetchEngine(fetch, 4).iter_pages(links()):
+            got.append(item)
+    assert sorted(got) == [("a", "html", None), ("b", "html", None)]
+
+
+def test_engine_rejects_zero_concurrency():
+    with pytest.raises(ValueError):
+        AsyncFetchEngine(lambda u: u, concurrency=0)
+
+
+def test_concurrent_run_against_stub_site(offline_db, stub_server, stub_config, recording_scraper):
+    base_url, _ = stub_server
+    scraper = recording_scraper(stub_config(concurrency=4))
+    scraper.run()
+
+    assert len(scraper.saved) == 3
+    titles = {p["title"] for p in scraper.saved.values()}
+    assert titles == {"Sunflower Seed Cookies", "Rice Noodle Stir Fry", "Oat Free Granola Bars"}
+    cookies = scraper.saved[f"{base_url}/recipe-1.html"]
+    assert "1 cup sunflower seed butter" in cookies["ingredients"]
+    assert cookies["tags"] == "Dessert, Nut-Free"
+
+
+def test_concurrent_fetch_keeps_retry_policy(offline_db, stub_server, stub_config, recording_scraper):
+    base_url, server = stub_server
+    scraper = recording_scraper(stub_config(concurrency=2))
+    urls = [f"{base_url}/flaky/recipe-2.html", f"{base_url}/recipe-3.html"]
+
+    engine = AsyncFetchEngine(scraper.fetch_page, scraper.concurrency)
+    results = {u: (h, e) for u, h, e in engine.iter_pages(urls)}
+
+    html, err = results[urls[0]]
+    assert err is None
+    assert "Rice Noodle Stir Fry" in html
+    assert server.hits.count("/flaky/recipe-2.html") == 2
@@ -0,0 +1,116 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+
+import pytest
+import requests
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from scrapers.browser_pool import BrowserPool
+
+RENDERED = '<h1 class="recipe-name">Client Rendered Hummus</h1><ul class="ingredients"><li>chickpeas</li></ul>'
+
+
+class FakeDriver:
+    """Loads pages over HTTP and 'renders' the JS-only fixture."""
+    instances = []
+
+    def __init__(self):
+        self.pages = 0
+        self.quit_called = False
+        FakeDriver.instances.append(self)
+
+    def get(self, url):
+        self.pages += 1
+        html = requests.get(url, timeout=5).text
+        if "js-recipe" in url:
+            html = html.replace('<div id="app"', RENDERED + '<div id="app"')
+        self.page_source = html
+
+    def find_element(self, by, selector):
+        if "recipe-name" in selector and "recipe-name" in self.page_source:
+            return object()
+        if "recipe-title" in selector and "recipe-title" in self.page_source:
+            return object()
+        raise NoSuchElementException(selector)
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_drivers():
+    FakeDriver.instances = []
+
+
+def test_pool_starts_lazily_and_reuses_browsers():
+    pool = BrowserPool(size=2, factory=FakeDriver)
+    assert pool.started == 0
+    for _ in range(5):
+        with pool.browser() as driver:
+            assert isinstance(driver, FakeDriver)
+    assert pool.started == 1
+    pool.close()
+    assert FakeDriver.instances[0].quit_called
+
+
+def test_pool_bounds_concurrent_browsers():
+    pool = BrowserPool(size=2, factory=FakeDriver)
+    peak, now, lock = [0], [0], threading.Lock()
+
+    def use():
+        with pool.browser():
+            with lock:
+                now[0] += 1
+                peak[0] = max(peak[0], now[0])
+            time.sleep(0.05)
+            with lock:
+                now[0] -= 1
+
+    threads = [threading.Thread(target=use) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2 and pool.started == 2
+
+
+def test_failed_browser_is_replaced_but_timeouts_keep_it():
+    pool = BrowserPool(size=1, factory=FakeDriver, healthy_errors=(TimeoutException,))
+    with pytest.raises(TimeoutException):
+        with pool.browser():
+            raise TimeoutException("slow page")
+    with pytest.raises(RuntimeError):
+        with pool.browser():
+            raise RuntimeError("chrome crashed")
+    with pool.browser():
+        pass
+    assert pool.started == 2
+    assert FakeDriver.instances[0].quit_called
+
+
+def test_selenium_site_uses_plain_http_unless_content_is_missing(offline_db, stub_server, stub_config, recording_scraper):
+    base_url, _ = stub_server
+    scraper = recording_scraper(stub_config(use_selenium=True, concurrency=2))
+    scraper.browser_pool.factory = FakeDriver
+
+    static = scraper.fetch_page(f"{base_url}/recipe-1.html", conditional=True)
+    rendered = scraper.fetch_page(f"{base_url}/js-recipe.html", conditional=True)
+
+    assert "Sunflower Seed Cookies" in static
+    assert "Client Rendered Hummus" in rendered
+    assert (scraper.plain_fetches, scraper.browser_fetches) == (1, 1)
+    assert scraper.browser_pool.started == 1
+
+
+def test_selenium_site_run_never_starts_a_browser_for_static_pages(offline_db, stub_server, stub_config, recording_scraper):
+    scraper = recording_scraper(stub_config(use_selenium=True, concurrency=2))
+    scraper.browser_pool.factory = FakeDriver
+    scraper.run()
+
+    assert len(scraper.saved) == 3
+    assert scraper.browser_pool.started == 0
+    assert scraper.plain_fetches == 4          # listing page + 3 recipes
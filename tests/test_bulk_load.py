@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.bulk_load import CopyStream, bulk_insert, staging_table
+
+
+class CopyCursor:
+    def __init__(self):
+        self.statements = []
+        self.copied = ""
+        self.rowcount = 2
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def copy_expert(self, sql, stream):
+        self.statements.append(sql)
+        while True:
+            chunk = stream.read(7)      # small reads, as psycopg2 does in blocks
+            if not chunk:
+                break
+            self.copied += chunk
+
+    def fetchall(self):
+        return [(10, 1, "milk")]
+
+
+def test_copy_stream_escapes_copy_text_format():
+    rows = [(1, "tab\there", None), (2, "back\\slash\nnew line\r", "ok")]
+    stream = CopyStream(rows, lines_per_read=1)
+    assert stream.read() == "1\ttab\\there\t\\N\n2\tback\\\\slash\\nnew line\\r\tok\n"
+    assert stream.rows == 2
+    assert stream.read() == ""
+
+
+def test_bulk_insert_stages_then_merges():
+    cur = CopyCursor()
+    count = bulk_insert(cur, "ingredient_allergens", ("ingredient_id", "recipe_id", "allergen"),
+                        [(1, 1, "Milk"), (2, 1, "Egg")], on_conflict="ON CONFLICT DO NOTHING")
+
+    create, truncate, copy, merge = cur.statements
+    staging = copy.split()[1]
+    assert staging in create and "ON COMMIT DELETE ROWS" in create
+    assert truncate == f"TRUNCATE {staging};"
+    assert cur.copied == "1\t1\tMilk\n2\t1\tEgg\n"
+    assert merge.startswith("INSERT INTO ingredient_allergens (ingredient_id, recipe_id, allergen)")
+    assert f"FROM {staging} ON CONFLICT DO NOTHING" in merge
+    assert count == 2
+
+
+def test_bulk_insert_returning_rows():
+    cur = CopyCursor()
+    rows = bulk_insert(cur, "processed_ingredients", ("recipe_id", "ingredient"), [(1, "milk")],
+                       returning="id, recipe_id, ingredient")
+    assert cur.statements[-1].endswith("RETURNING id, recipe_id, ingredient;")
+    assert rows == [(10, 1, "milk")]
+
+
+def test_bulk_insert_against_postgres(pg_connection):
+    cur = pg_connection.cursor()
+    cur.execute(
+        "CREATE TABLE tags (id SERIAL PRIMARY KEY, recipe_id INT NOT NULL,"
+        " allergen TEXT NOT NULL, note TEXT, UNIQUE (recipe_id, allergen));"
+    )
+    columns = ("recipe_id", "allergen", "note")
+
+    rows = bulk_insert(cur, "tags", columns,
+                       [(1, "Milk", None), (1, "Egg", "tab\there"), (2, "Soy", "back\\slash\nline")],
+                       returning="recipe_id, allergen, note")
+    assert sorted(rows) == [(1, "Egg", "tab\there"), (1, "Milk", None), (2, "Soy", "back\\slash\nline")]
+
+    # same transaction: the staging table is reused and truncated first
+    staging = staging_table(cur, "tags", columns)
+    cur.execute(f"SELECT count(*) FROM {staging};")
+    assert cur.fetchone() == (0,)
+    assert bulk_insert(cur, "tags", columns, [(1, "Milk", "again"), (3, "Fish", None)],
+                       on_conflict="ON CONFLICT DO NOTHING") == 1
+    pg_connection.commit()
+
+    # after commit the rows stay in the target, and the staging table is empty
+    cur.execute(f"SELECT count(*) FROM {staging};")
+    assert cur.fetchone() == (0,)
+    cur.execute("SELECT recipe_id, allergen, note FROM tags ORDER BY id;")
+    assert cur.fetchall() == [(1, "Milk", None), (1, "Egg", "tab\there"),
+                              (2, "Soy", "back\\slash\nline"), (3, "Fish", None)]
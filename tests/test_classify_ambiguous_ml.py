@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from scripts.allergen_cache import AllergenCache
+from scripts.classify_ambiguous_ml import COMPACT_PATH, MODEL_PATH, predict_allergens, predict_tags
+from scripts.compact_model import CompactModel, export_model
+
+ROOT = Path(__file__).resolve().parents[1]
+
+VOCAB = ["Egg", "Milk", "Soy"]
+PROBS = {
+    "cream":        [0.01, 0.95, 0.02],
+    "coconut milk": [0.00, 0.80, 0.10],
+    "tofu":         [0.10, 0.05, 0.30],
+    "eggnog":       [0.70, 0.40, 0.00],
+    "salt":         [0.00, 0.00, 0.00],
+}
+
+
+class FakePipe:
+    """predict_proba stand-in recording the size of every call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict_proba(self, texts):
+        self.calls.append(len(texts))
+        return np.array([PROBS[t] for t in texts])
+
+
+def reference(texts, threshold):
+    """Dense per-probability loop the batched path replaced."""
+    out = []
+    for text in texts:
+        found = [VOCAB[i] for i, p in enumerate(PROBS[text]) if p >= threshold]
+        out.append([a for a in found if not (a == "Milk" and text == "coconut milk")])
+    return out
+
+
+def test_batched_threshold_matches_reference():
+    pipe = FakePipe()
+    texts = list(PROBS) * 3
+    assert predict_allergens((pipe, VOCAB), texts, 0.30, batch_size=4) == reference(texts, 0.30)
+    assert pipe.calls == [4, 4, 4, 3]
+    assert predict_allergens((pipe, VOCAB), [], 0.30) == []
+
+
+def test_predict_tags_fans_out_distinct_predictions():
+    pipe = FakePipe()
+    rows = [(1, 1, "cream"), (2, 1, "eggnog"), (3, 2, "cream"), (4, 2, "coconut milk")]
+    tags = predict_tags((pipe, VOCAB), rows, 0.30, cache=AllergenCache("ml", "v"))
+    assert tags == [(1, 1, "Milk"), (2, 1, "Egg"), (2, 1, "Milk"), (3, 2, "Milk")]
+    assert pipe.calls == [3]
+
+
+def training_texts():
+    with open(ROOT / "data" / "ambiguous_train.csv", newline="", encoding="utf-8") as fh:
+        return [row["ingredient"] for row in csv.DictReader(fh)]
+
+
+@pytest.mark.filterwarnings("ignore:Label not 3 is present")
+def test_compact_export_reproduces_predict_proba(tmp_path):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.multiclass import OneVsRestClassifier
+    from sklearn.pipeline import Pipeline
+
+    X = ["whole milk", "cream cheese", "egg yolk", "soy sauce", "salt", "milk chocolate bar",
+         "scrambled eggs with milk", "tofu"]
+    Y = np.array([[0, 1, 0, 0], [0, 1, 0, 0], [1, 0, 0, 0], [0, 0, 1, 0],
+                  [0, 0, 0, 0], [0, 1, 0, 0], [1, 1, 0, 0], [0, 0, 1, 0]])    # last label never set
+    pipe = Pipeline([("tfidf", TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True)),
+                     ("clf", OneVsRestClassifier(LogisticRegression()))]).fit(X, Y)
+    model = CompactModel(export_model(pipe, ["Egg", "Milk", "Soy", "Fish"], tmp_path / "m"))
+
+    texts = X + ["", "Milk MILK milk", "unknown words only", "crème fraîche & egg-whites"]
+    assert model.labels == ["Egg", "Milk", "Soy", "Fish"]
+    assert np.allclose(model.predict_proba(texts), pipe.predict_proba(texts), rtol=0, atol=1e-12)
+
+
+def test_checked_in_export_matches_pickled_pipeline():
+    import joblib
+
+    pipe, vocab = joblib.load(MODEL_PATH)
+    model = CompactModel(COMPACT_PATH)
+    texts = training_texts()
+    assert model.labels == vocab
+    assert np.allclose(model.predict_proba(texts), pipe.predict_proba(texts), rtol=0, atol=1e-12)
@@ -0,0 +1,151 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import random
+import re
+from pathlib import Path
+
+from scripts.clean_ingredients import normalize_ingredient, normalize_lines, normalize_parallel
+
+# input → output pairs recorded from the original four-pass normalize_ingredient
+GOLDEN = json.loads(
+    (Path(__file__).parent / "fixtures" / "ingredient_golden.json").read_text(encoding="utf-8")
+)
+
+
+def reference_normalize(raw_text):
+    """The original per-line implementation."""
+    text = raw_text.lower()
+    text = re.sub(r"\(.*?\)", " ", text)
+    text = re.sub(r"[^a-zA-Z\s]", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    units_pattern = r"\b\d+\b|\b(?:cup|cups|tbsp|tsp|tablespoon|teaspoon|gram|grams|g|kg|oz|ounce|ounces|ml|liter|litre|l)\b"
+    text = re.sub(units_pattern, "", text)
+    return text.strip()
+
+
+def test_golden_lines():
+    for raw, expected in GOLDEN:
+        assert normalize_ingredient(raw) == expected, raw
+
+
+def test_batch_matches_golden():
+    lines = [raw for raw, _ in GOLDEN]
+    expected = [out for _, out in GOLDEN]
+    assert normalize_lines(lines) == expected
+    assert normalize_lines([]) == []
+
+
+def test_parallel_chunks_keep_order():
+    lines = [raw for raw, _ in GOLDEN] * 3
+    expected = [out for _, out in GOLDEN] * 3
+    assert normalize_parallel(lines, workers=2, chunk_size=20) == expected
+
+
+def test_random_lines_match_reference():
+    rng = random.Random(17)
+    alphabet = "abcdeglmorstuz ACGLT0123456789()(),.-/%½é\t\xa0\r"
+    words = ["cup", "cups", "g", "kg", "l", "oz", "tsp", "flour", "milk", "egg", "(1 oz)"]
+    lines = [
+        "".join(rng.choice(alphabet) if rng.random() < 0.6 else " " + rng.choice(words) + " "
+                for _ in range(rng.randint(0, 30)))
+        for _ in range(2000)
+    ]
+    expected = [reference_normalize(line) for line in lines]
+    assert [normalize_ingredient(line) for line in lines] == expected
+    assert normalize_lines(lines) == expected
+    # lines with their own line break fall back to the per-line path
+    assert normalize_lines(["2 cups\nflour", "1 egg"]) == [
+        reference_normalize("2 cups\nflour"), reference_normalize("1 egg")]
+
+
+class NamedStream:
+    """Server-side cursor stand-in serving the recipes in fetchmany chunks."""
+
+    def __init__(self, conn, name, withhold):
+        self.conn = conn
+        conn.withhold = withhold
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.conn.log.append(" ".join(sql.split())[:40])
+        self._rows = list(self.conn.recipes)
+
+    def fetchmany(self, size):
+        chunk, self._rows = self._rows[:size], self._rows[size:]
+        return chunk
+
+    def close(self):
+        self.conn.log.append("CLOSE")
+
+
+class BatchConnection:
+    """Cursor + connection stand-in that logs statements between commits."""
+
+    def __init__(self, recipes):
+        self.recipes = recipes
+        self.log = []
+        self._result = []
+        self._copied = []
+        self._next_id = 1
+        self.rowcount = 0
+
+    def cursor(self, name=None, withhold=False):
+        return NamedStream(self, name, withhold) if name else self
+
+    def copy_expert(self, sql, stream):
+        self._copied = [line.split("\t") for line in stream.read().splitlines()]
+
+    def execute(self, sql, params=None):
+        self.log.append(" ".join(sql.split())[:40])
+        self._result = []
+        if sql.startswith("INSERT INTO processed_ingredients"):
+            for rid, text in self._copied:
+                self._result.append((self._next_id, int(rid), text))
+                self._next_id += 1
+        elif sql.startswith("INSERT INTO ingredient_allergens"):
+            self.log.append(("tags", [tuple(row) for row in self._copied]))
+        self.rowcount = len(self._copied)
+
+    def fetchall(self):
+        return self._result
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+    def close(self):
+        pass
+
+
+def test_rebuild_rewrites_and_tags_each_batch_in_one_transaction(monkeypatch):
+    from scripts import clean_ingredients
+
+    recipes = [(1, "2 cups milk\n1 egg"), (2, "Preheat the oven\nsalt"), (3, None)]
+    conn = BatchConnection(recipes)
+    monkeypatch.setattr(clean_ingredients.db_pool, "connect", lambda *a, **kw: conn)
+
+    def tagger(rows, cur=None):
+        return [(ing_id, rid, "Milk") for ing_id, rid, text in rows if text == "milk"], ["rule_based"]
+
+    monkeypatch.setattr(clean_ingredients, "load_tagger", lambda: tagger)
+    clean_ingredients.main(batch_size=2, workers=1)
+
+    assert not any("TRUNCATE TABLE processed" in str(entry) for entry in conn.log)
+    select = next(i for i, entry in enumerate(conn.log)
+                  if str(entry).startswith("SELECT id, ingredients"))
+    assert conn.withhold                # the stream outlives each batch's commit
+    assert conn.log[-1] == "CLOSE"
+    batches = " | ".join(map(str, conn.log[select + 1:-1])).split("COMMIT")[:-1]
+    assert len(batches) == 2
+    first, second = batches
+    # delete, insert, tags and watermarks of a batch share one commit
+    assert first.index("DELETE FROM ingredient_allergens") < first.index("INSERT INTO processed_ingredients")
+    assert "('tags', [('1', '1', 'Milk')])" in first
+    assert first.count("INSERT INTO pipeline_progress") == 2
+    assert "INSERT INTO processed_ingredients" not in second   # recipe 3 has no ingredients
+    assert "DELETE FROM processed_ingredients" in second
@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scrapers.base_scraper import BaseRecipeScraper
+
+
+def test_fetch_records_validators(offline_db, stub_server, stub_config):
+    base_url, _ = stub_server
+    scraper = BaseRecipeScraper(stub_config())
+    url = f"{base_url}/recipe-1.html"
+
+    html = scraper.fetch_page(url)
+    assert "Sunflower Seed Cookies" in html
+    etag, last_modified = scraper._fresh_validators[url]
+    assert last_modified
+
+
+def test_conditional_fetch_returns_none_on_304(offline_db, stub_server, stub_config):
+    base_url, _ = stub_server
+    scraper = BaseRecipeScraper(stub_config())
+    url = f"{base_url}/recipe-2.html"
+    scraper.fetch_page(url)
+    scraper._validators[url] = scraper._fresh_validators.pop(url)
+
+    assert scraper.fetch_page(url, conditional=True) is None
+    # plain fetches (listing pages) never send validators
+    assert "Rice Noodle Stir Fry" in scraper.fetch_page(url)
+
+
+def test_conditional_get_can_be_disabled(offline_db, stub_server, stub_config):
+    base_url, _ = stub_server
+    scraper = BaseRecipeScraper(stub_config(conditional_get=False))
+    url = f"{base_url}/recipe-3.html"
+    scraper.fetch_page(url)
+    scraper._validators[url] = scraper._fresh_validators.pop(url)
+
+    assert "Oat Free Granola Bars" in scraper.fetch_page(url, conditional=True)
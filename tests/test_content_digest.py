@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scrapers.base_scraper import BaseRecipeScraper, html_digest, recipe_digest
+
+PARSED = {
+    "site_name": "Stub Site",
+    "title": "Rice Noodle Stir Fry",
+    "ingredients": "200 g rice noodles\n1 red pepper",
+    "instructions": "Soak the noodles.",
+    "tags": "Main",
+}
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def fetchone(self):
+        return (7,)
+
+
+def test_recipe_digest_ignores_site_name_but_not_fields():
+    assert recipe_digest(PARSED) == recipe_digest(dict(PARSED, site_name="Other"))
+    assert recipe_digest(PARSED) != recipe_digest(dict(PARSED, tags="Main, Quick"))
+    assert html_digest("<html>a</html>") != html_digest("<html>b</html>")
+
+
+def test_unchanged_recipe_is_not_rewritten(offline_db, stub_config):
+    scraper = BaseRecipeScraper(stub_config())
+    scraper.db_cursor = RecordingCursor()
+    html = "<html>stir fry</html>"
+    scraper._known["http://x/r"] = (7, html_digest(html), recipe_digest(PARSED))
+
+    scraper.save_recipe("http://x/r", html, PARSED)
+    assert scraper.db_cursor.statements == []
+    assert scraper.unchanged == 1
+
+
+def test_changed_fields_skip_only_the_raw_insert(offline_db, stub_config):
+    scraper = BaseRecipeScraper(stub_config())
+    html = "<html>stir fry</html>"
+    scraper._known["http://x/r"] = (7, html_digest(html), "stale")
+
+    recipe = scraper._prepare_recipe("http://x/r", html, PARSED)
+    assert recipe.raw_id == 7            # HTML unchanged → no raw insert
+    assert recipe.clean_digest == recipe_digest(PARSED)
+
+    recipe = scraper._prepare_recipe("http://x/r", "<html>new</html>", PARSED)
+    assert recipe.raw_id is None
@@ -0,0 +1,142 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import scrapers.db_writer as db_writer
+from scrapers.base_scraper import BaseRecipeScraper
+from scrapers.crawl_state import CrawlState, DONE, FAILED, LISTING, PENDING, RECIPE
+
+
+def test_new_cycle_starts_from_start_urls(state_connection):
+    conn = state_connection()
+    state = CrawlState(conn, "Stub Site")
+    plan = state.start(["http://example.com/list"])
+
+    assert not plan.resumed
+    assert plan.listing_urls == ["http://example.com/list"]
+    state.flush()
+    assert conn.status("http://example.com/list") == PENDING
+
+
+def test_new_cycle_restarts_given_up_start_url(state_connection):
+    now = datetime.now()
+    conn = state_connection([
+        ("http://example.com/list", LISTING, FAILED, 5, now + timedelta(hours=1)),
+        ("http://example.com/old", LISTING, FAILED, 5, now - timedelta(hours=1)),
+        ("http://example.com/r1", RECIPE, DONE, 0, None),
+    ])
+    state = CrawlState(conn, "Stub Site", max_attempts=5)
+    plan = state.start(["http://example.com/list"])
+
+    assert not plan.resumed
+    assert plan.listing_urls == ["http://example.com/list"]
+    assert "http://example.com/list" not in plan.done_pages
+    assert plan.done_pages == {"http://example.com/old"} and plan.gave_up == 1
+    resets = [params for sql, params in conn.executed
+              if isinstance(sql, str) and "SET attempts = 0" in sql]
+    assert resets == [("Stub Site", ["http://example.com/list"])]
+    state.flush()
+    assert conn.status("http://example.com/list") == PENDING
+
+
+def test_resume_picks_up_pending_and_due_failures(state_connection):
+    now = datetime.now()
+    conn = state_connection([
+        ("http://example.com/list", LISTING, DONE, 0, None),
+        ("http://example.com/list?page=2", LISTING, PENDING, 0, None),
+        ("http://example.com/r1", RECIPE, DONE, 0, None),
+        ("http://example.com/r2", RECIPE, PENDING, 0, None),
+        ("http://example.com/r3", RECIPE, FAILED, 1, now - timedelta(minutes=1)),
+        ("http://example.com/r4", RECIPE, FAILED, 2, now + timedelta(hours=1)),
+        ("http://example.com/r5", RECIPE, FAILED, 5, now - timedelta(minutes=1)),
+    ])
+    plan = CrawlState(conn, "Stub Site", max_attempts=5).start(["http://example.com/list"])
+
+    assert plan.resumed
+    assert plan.listing_urls == ["http://example.com/list?page=2"]
+    assert plan.recipe_urls == ["http://example.com/r2", "http://example.com/r3"]
+    assert plan.gave_up == 1
+    assert "http://example.com/list" in plan.done_pages
+    # finished, still backing off or given up: none of them is fetched again
+    assert {"http://example.com/r1", "http://example.com/r4",
+            "http://example.com/r5"} <= plan.done_links
+
+
+def test_run_resumes_from_saved_state(offline_db, stub_server, stub_config, recording_scraper, state_connection):
+    base_url, server = stub_server
+    scraper = recording_scraper(stub_config())
+    scraper.db_connection = state_connection([
+        (f"{base_url}/listing.html", LISTING, DONE, 0, None),
+        (f"{base_url}/recipe-1.html", RECIPE, DONE, 0, None),
+        (f"{base_url}/recipe-2.html", RECIPE, PENDING, 0, None),
+    ])
+    scraper.run()
+
+    assert "/listing.html" not in server.hits
+    assert list(scraper.saved) == [f"{base_url}/recipe-2.html"]
+    assert scraper.db_connection.status(f"{base_url}/recipe-2.html") == DONE
+
+
+def test_failed_recipe_is_recorded_for_retry(offline_db, stub_server, stub_config, recording_scraper, state_connection):
+    base_url, server = stub_server
+    scraper = recording_scraper(stub_config())
+    scraper.db_connection = conn = state_connection([
+        (f"{base_url}/missing.html", RECIPE, PENDING, 0, None),
+    ])
+    scraper.run()
+
+    assert conn.status(f"{base_url}/missing.html") == FAILED
+
+
+def test_time_budget_stops_run_and_leaves_cycle_open(offline_db, stub_server, stub_config, recording_scraper, state_connection):
+    base_url, server = stub_server
+    scraper = recording_scraper(stub_config())
+    scraper.db_connection = conn = state_connection()
+    scraper.run(time_budget=1e-6)
+
+    assert scraper.budget_exhausted
+    assert scraper.saved == {}
+    assert not scraper.cycle_complete()
+    assert conn.status(f"{base_url}/recipe-1.html") == PENDING
+
+
+def test_recipe_done_only_after_writer_commits(offline_db, stub_server, stub_config, monkeypatch, state_connection):
+    base_url, server = stub_server
+    bad, good = f"{base_url}/recipe-1.html", f"{base_url}/recipe-2.html"
+
+    def write_batch(cur, site_name, recipes, *args, **kwargs):
+        if any(r.url == bad for r in recipes):
+            raise RuntimeError("constraint violated")
+
+    monkeypatch.setattr(db_writer, "write_batch", write_batch)
+    scraper = BaseRecipeScraper(stub_config(batch_size=10))
+    scraper.db_connection = conn = state_connection([
+        (f"{base_url}/listing.html", LISTING, DONE, 0, None),
+        (bad, RECIPE, PENDING, 0, None),
+        (good, RECIPE, PENDING, 0, None),
+    ])
+    scraper.run()
+
+    assert conn.status(good) == DONE
+    failed = [row for row in conn.written if row[0] == bad][-1]
+    assert failed[3] == FAILED and "constraint violated" in failed[4]
+
+
+def test_interrupted_batch_leaves_recipes_pending(offline_db, stub_server, stub_config, monkeypatch, state_connection):
+    base_url, server = stub_server
+    url = f"{base_url}/recipe-1.html"
+
+    def write_batch(*args, **kwargs):
+        raise KeyboardInterrupt     # the process dies before the batch commits
+
+    monkeypatch.setattr(db_writer, "write_batch", write_batch)
+    scraper = BaseRecipeScraper(stub_config(batch_size=10))
+    scraper.db_connection = conn = state_connection([(url, RECIPE, PENDING, 0, None)])
+    with pytest.raises(KeyboardInterrupt):
+        scraper.run()
+
+    assert all(row[3] != DONE for row in conn.written if row[0] == url)
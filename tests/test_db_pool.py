@@ -0,0 +1,127 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+
+import psycopg2
+import pytest
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+from app import engine_options
+from scrapers import db_pool
+from scrapers.db_pool import ConnectionPool
+
+
+class PingConnection:
+    """Connection stand-in that tracks pings, rollbacks and closing."""
+
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+        self.closed = 0
+        self.broken = False
+        self.autocommit = False
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        if self.broken:
+            raise psycopg2.OperationalError("server closed the connection")
+        self.in_transaction = True
+
+    def get_transaction_status(self):
+        if self.in_transaction:
+            return extensions.TRANSACTION_STATUS_INTRANS
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def fake_connect(monkeypatch):
+    opened = []
+
+    def connect(*args, **kwargs):
+        conn = PingConnection(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(psycopg2, "connect", connect)
+    db_pool.close_all()
+    yield opened
+    db_pool.close_all()
+
+
+def test_close_returns_connection_for_reuse(fake_connect):
+    pool = ConnectionPool("postgresql://db", size=2)
+    first = pool.connect()
+    raw = first.raw
+    first.cursor().execute("UPDATE t SET x = 1;")
+    first.close()
+
+    assert raw.rollbacks >= 1 and not raw.in_transaction
+    second = pool.connect()
+    assert second.raw is raw
+    assert len(fake_connect) == 1
+    second.close()
+    assert second.closed
+
+
+def test_dead_connection_is_replaced_on_checkout(fake_connect):
+    pool = ConnectionPool("postgresql://db", size=2)
+    conn = pool.connect()
+    conn.raw.broken = True
+    conn.close()
+
+    fresh = pool.connect()
+    assert fresh.raw is not fake_connect[0]
+    assert fake_connect[0].closed
+    fresh.close()
+
+
+def test_borrowers_wait_when_pool_is_exhausted(fake_connect):
+    pool = ConnectionPool("postgresql://db", size=1)
+    held = pool.connect()
+    with pytest.raises(PoolError):
+        pool.connect(timeout=0.05)
+
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.connect()))
+    waiter.start()
+    time.sleep(0.05)
+    assert not got
+    held.close()
+    waiter.join(timeout=2)
+
+    assert got and got[0].raw is fake_connect[0]
+    assert len(fake_connect) == 1
+
+
+def test_shared_pool_per_url_with_statement_timeout(fake_connect, monkeypatch):
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "30000")
+    a = db_pool.connect("postgresql://db")
+    b = db_pool.connect("postgresql://db")
+
+    assert db_pool.get_pool("postgresql://db") is db_pool.get_pool("postgresql://db")
+    assert a.raw.kwargs["options"] == "-c statement_timeout=30000"
+    a.close()
+    b.close()
+
+
+def test_flask_pool_options_only_for_postgres(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")       # the pipeline's, not the web app's
+    monkeypatch.setenv("WEB_DB_POOL_SIZE", "3")
+    assert engine_options("sqlite:///:memory:") == {}
+    options = engine_options("postgresql://u:p@host/db")
+    assert options["pool_size"] == 3
+    assert options["pool_pre_ping"] is True
@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.db_stream import iter_chunks
+
+
+class ServerCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.fetches = []
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.sql = sql
+
+    def fetchmany(self, size):
+        self.fetches.append(size)
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+class Conn:
+    def __init__(self, rows):
+        self.stream = ServerCursor(rows)
+
+    def cursor(self, name=None, withhold=False):
+        assert name, "chunked reads must use a named (server-side) cursor"
+        self.stream.name, self.stream.withhold = name, withhold
+        return self.stream
+
+
+def test_chunks_are_fetched_one_at_a_time():
+    conn = Conn([(i,) for i in range(7)])
+    chunks = iter_chunks(conn, "s", "SELECT 1", size=3)
+
+    assert next(chunks) == [(0,), (1,), (2,)]
+    assert conn.stream.fetches == [3]          # nothing read ahead
+    assert [len(c) for c in chunks] == [3, 1]
+    assert conn.stream.closed
+    assert conn.stream.itersize == 3
+
+
+def test_stream_closed_when_consumer_stops_early():
+    conn = Conn([(i,) for i in range(10)])
+    for _ in iter_chunks(conn, "s", "SELECT 1", size=2, withhold=True):
+        break
+    assert conn.stream.closed and conn.stream.withhold
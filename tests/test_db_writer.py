@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+import scrapers.db_writer as db_writer
+from scrapers.db_writer import PendingRecipe, RecipeWriter
+
+
+class CountingConnection:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self
+
+    def close(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def recipe(n):
+    parsed = {"site_name": "Stub", "title": f"Recipe {n}", "ingredients": "",
+              "instructions": "", "tags": ""}
+    return PendingRecipe(f"http://x/{n}", "<html></html>", parsed, "r", "c")
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    calls = []
+
+    def fake_write_batch(cur, site_name, recipes, validators=(), **kwargs):
+        if any(r.url == "http://x/bad" for r in recipes):
+            raise RuntimeError("bad row")
+        calls.append(([r.url for r in recipes], list(validators)))
+
+    monkeypatch.setattr(db_writer, "write_batch", fake_write_batch)
+    return calls
+
+
+def test_writer_commits_once_per_batch_and_flushes_on_exit(batches):
+    conn = CountingConnection()
+    saved = []
+    with RecipeWriter(conn, "Stub", batch_size=3, on_saved=saved.append) as writer:
+        for n in range(7):
+            writer.add(recipe(n))
+    assert [len(urls) for urls, _ in batches] == [3, 3, 1]
+    assert conn.commits == 3
+    assert writer.rows_written == len(saved) == 7
+
+
+def test_failed_batch_is_retried_row_by_row(batches):
+    conn = CountingConnection()
+    bad = recipe(1)
+    bad.url = "http://x/bad"
+    writer = RecipeWriter(conn, "Stub", batch_size=10)
+    for r in (recipe(0), bad, recipe(2)):
+        writer.add(r)
+    writer.add_validators("http://x/9", ("etag", None))
+    writer.flush()
+
+    assert conn.rollbacks == 2
+    assert [urls for urls, _ in batches] == [["http://x/0"], ["http://x/2"], []]
+    assert batches[-1][1] == [("http://x/9", ("etag", None))]
+    assert writer.rows_written == 2
+
+
+def test_clean_upsert_target_is_a_unique_key_in_db_setup():
+    from pathlib import Path
+
+    ddl = " ".join((Path(__file__).resolve().parents[1] / "db_setup.sql").read_text().split())
+    assert "ON CONFLICT (site_name, recipe_title)" in db_writer.INSERT_CLEAN
+    assert ("CREATE UNIQUE INDEX IF NOT EXISTS clean_recipes_site_title_key "
+            "ON clean_recipes (site_name, recipe_title);") in ddl
@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+
+from scrapers.frontier import CrawlFrontier, normalize_url
+
+
+def test_normalize_url_strips_tracking_and_fragments():
+    assert normalize_url("HTTPS://Example.com:443/r/1?utm_source=x&b=2&a=1&fbclid=z#top") == \
+        "https://example.com/r/1?a=1&b=2"
+    assert normalize_url("http://example.com") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/x?page=2") == "http://example.com:8080/x?page=2"
+
+
+def chains(n_chains, n_pages):
+    """Listing pages ``c<i>p<j>``; each links two recipes, one shared by all chains."""
+    pages = {}
+    for c in range(n_chains):
+        for p in range(n_pages):
+            nxt = f"http://s/c{c}p{p + 1}" if p + 1 < n_pages else None
+            pages[f"http://s/c{c}p{p}"] = (
+                [f"http://s/r/{c}-{p}?utm_medium=list", "http://s/r/shared"], nxt
+            )
+    return pages
+
+
+def test_chains_are_crawled_concurrently_and_links_deduped():
+    pages = chains(3, 3)
+    lock = threading.Lock()
+    state = {"now": 0, "peak": 0}
+
+    def fetch(url):
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.05)
+        with lock:
+            state["now"] -= 1
+        return url
+
+    frontier = CrawlFrontier(fetch, lambda html: pages[html], concurrency=4)
+    start = time.perf_counter()
+    links = list(frontier.iter_links([f"http://s/c{c}p0" for c in range(3)] + ["http://s/c0p0"]))
+
+    assert time.perf_counter() - start < 0.4      # 3 pages deep, not 9 pages serially
+    assert state["peak"] == 3
+    assert len(links) == len(set(links)) == 3 * 3 + 1
+    assert "http://s/r/0-0" in links
+    assert frontier.pages_crawled == 9
+
+
+def test_links_stream_before_discovery_finishes():
+    pages = chains(1, 4)
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return url
+
+    links = CrawlFrontier(fetch, lambda html: pages[html], concurrency=1).iter_links(["http://s/c0p0"])
+    first = next(links)
+    assert first == "http://s/r/0-0"
+    assert len(fetched) < 4
+    links.close()
+
+
+def test_failed_listing_page_does_not_stop_other_chains():
+    pages = chains(2, 2)
+
+    def fetch(url):
+        if url == "http://s/c0p0":
+            raise RuntimeError("boom")
+        return url
+
+    links = list(CrawlFrontier(fetch, lambda html: pages[html]).iter_links(["http://s/c0p0", "http://s/c1p0"]))
+    assert sorted(links) == ["http://s/r/1-0", "http://s/r/1-1", "http://s/r/shared"]
+
+
+def test_follow_next_can_end_a_chain():
+    pages = chains(1, 4)
+    seen = []
+
+    def follow(links):
+        seen.append(links)
+        return len(seen) < 2
+
+    frontier = CrawlFrontier(lambda url: url, lambda html: pages[html], follow_next=follow)
+    links = list(frontier.iter_links(["http://s/c0p0"]))
+
+    assert frontier.pages_crawled == 2 and frontier.chains_stopped == 1
+    assert seen[0] == ["http://s/r/0-0", "http://s/r/shared"]
+    assert "http://s/r/0-1" in links
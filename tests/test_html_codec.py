@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pathlib import Path
+
+import pytest
+
+from scrapers.db_writer import PendingRecipe, raw_row
+from scrapers.html_codec import (
+    DEFLATE_DICT, GZIP, PLAIN, available_codecs, decode_html, encode_html, train_dictionary,
+)
+
+STUB_SITE = Path(__file__).resolve().parent / "fixtures" / "stub_site"
+PAGES = [(STUB_SITE / f"recipe-{n}.html").read_text() for n in (1, 2, 3)]
+
+
+@pytest.mark.parametrize("codec", [c for c in available_codecs() if c != DEFLATE_DICT])
+def test_round_trip(codec):
+    for html in PAGES:
+        text, blob = encode_html(html, codec)
+        assert decode_html(text, blob, codec) == html
+        assert (text is None) == (codec != PLAIN)
+
+
+def test_dictionary_round_trip_and_beats_gzip():
+    dictionary = train_dictionary(PAGES[:2])
+    assert dictionary
+    _, with_dict = encode_html(PAGES[2], DEFLATE_DICT, dictionary)
+    _, gzipped = encode_html(PAGES[2], GZIP)
+    assert decode_html(None, memoryview(with_dict), DEFLATE_DICT, dictionary) == PAGES[2]
+    assert len(with_dict) < len(gzipped)
+
+
+def test_raw_row_falls_back_to_gzip_without_dictionary():
+    recipe = PendingRecipe("http://x/1", PAGES[0], {}, "d1", "d2")
+    site, url, text, blob, codec, dict_id, digest = raw_row("Stub", recipe, DEFLATE_DICT)
+    assert (text, codec, dict_id, digest) == (None, GZIP, None, "d1")
+    assert decode_html(None, blob, codec) == PAGES[0]
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        encode_html("<html></html>", "brotli")
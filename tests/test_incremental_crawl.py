@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+
+@pytest.fixture
+def paged_scraper(offline_db, stub_server, stub_config, recording_scraper):
+    """Incremental scraper over paged-1 → paged-2 → paged-3 with recipes 1 and 2 stored."""
+    base_url, server = stub_server
+    scraper = recording_scraper(stub_config(
+        start_urls=[f"{base_url}/paged-1.html"],
+        pagination_selector="a.next",
+        incremental=True,
+        refresh_days=7,
+    ))
+
+    def load_known(checked_days_ago):
+        checked = datetime.now() - timedelta(days=checked_days_ago)
+        scraper._known = {f"{base_url}/recipe-{n}.html": (n, "raw", "clean") for n in (1, 2)}
+        scraper._checked_at = {url: checked for url in scraper._known}
+
+    scraper.load_known_digests = lambda: load_known(scraper.checked_days_ago)
+    scraper.checked_days_ago = 1
+    return base_url, server, scraper
+
+
+def test_incremental_run_stops_at_known_page_and_skips_fresh_recipes(paged_scraper):
+    base_url, server, scraper = paged_scraper
+    scraper.run(full_crawl=False)
+
+    assert "/paged-2.html" in server.hits
+    assert "/paged-3.html" not in server.hits
+    assert list(scraper.saved) == [f"{base_url}/recipe-3.html"]
+    assert scraper.skipped_fresh == 2
+
+
+def test_known_recipes_are_refetched_after_refresh_interval(paged_scraper):
+    base_url, server, scraper = paged_scraper
+    scraper.checked_days_ago = 30
+    scraper.run(full_crawl=False)
+
+    assert "/paged-3.html" not in server.hits
+    assert len(scraper.saved) == 3
+    assert scraper.skipped_fresh == 0
+
+
+def test_full_crawl_walks_every_page(paged_scraper):
+    base_url, server, scraper = paged_scraper
+    scraper.run(full_crawl=True)
+
+    assert "/paged-3.html" in server.hits
+    assert len(scraper.saved) == 3
+
+
+def test_full_crawl_is_due_without_history(paged_scraper):
+    _, _, scraper = paged_scraper
+    assert scraper.full_crawl_due()          # offline DB has no site_crawls row
+    scraper.incremental = False
+    assert scraper.full_crawl_due()
@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pathlib import Path
+
+from scrapers.parsing import RecipeParser, extract_jsonld_recipe
+
+STUB_SITE = Path(__file__).resolve().parent / "fixtures" / "stub_site"
+CONFIG = {
+    "title_selector": "h1.recipe-name",
+    "ingredients_selector": "ul.ingredients li",
+    "instructions_selector": "ol.steps li",
+    "tags_selector": "span.tag",
+}
+
+
+def test_jsonld_recipe_is_mapped_to_parsed_fields():
+    parser = RecipeParser(CONFIG, "Stub")
+    parsed = parser.parse((STUB_SITE / "jsonld-recipe.html").read_text())
+
+    assert parsed == {
+        "site_name": "Stub",
+        "title": "Dairy-Free Mac & Cheese",
+        "ingredients": "8 oz elbow pasta\n1 cup oat milk",
+        "instructions": "Warm the oat milk.\nWhisk in nutritional yeast.\nToss with the pasta.",
+        "tags": "dairy-free, nut-free, comfort food",
+    }
+    assert parser.jsonld_hits == 1
+
+
+def test_pages_without_jsonld_use_selectors():
+    parser = RecipeParser(CONFIG, "Stub")
+    parsed = parser.parse((STUB_SITE / "recipe-1.html").read_text())
+    assert parsed["title"] == "Sunflower Seed Cookies"
+    assert parser.jsonld_hits == 0
+
+
+def test_broken_or_incomplete_jsonld_is_ignored():
+    broken = '<script type="application/ld+json">{"@type": "Recipe", </script>'
+    no_ingredients = '<script type="application/ld+json">{"@type": "Recipe", "name": "X"}</script>'
+    assert extract_jsonld_recipe(broken) is None
+    assert extract_jsonld_recipe(no_ingredients) is None
+    assert extract_jsonld_recipe("<html></html>") is None
+
+
+def test_jsonld_can_be_disabled():
+    parser = RecipeParser(dict(CONFIG, jsonld=False), "Stub")
+    parsed = parser.parse((STUB_SITE / "jsonld-recipe.html").read_text())
+    assert parsed["title"] == "Markup Title"
@@ -0,0 +1,47 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+from pathlib import Path
+
+import pytest
+
+from scrapers.parsing import RecipeParser
+from scrapers.pipeline import ParsePool, resolve_workers
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_parse_pool_matches_inline_parser():
+    config = json.loads((ROOT / "config" / "theprettybee.json").read_text(encoding="utf-8"))
+    html = (ROOT / "tests" / "fixtures" / "sites" / "theprettybee.html").read_text(encoding="utf-8")
+    pages = [(f"https://x/{i}", html) for i in range(10)] + [("https://x/bad", None)]
+
+    with ParsePool(config, "The Pretty Bee", workers=2, max_pending=3) as pool:
+        results = {url: (parsed, err) for url, _, parsed, err in pool.imap(pages)}
+
+    expected = RecipeParser(config, "The Pretty Bee").parse(html)
+    assert len(results) == 11
+    assert all(results[f"https://x/{i}"] == (expected, None) for i in range(10))
+    assert results["https://x/bad"][0] is None
+    assert results["https://x/bad"][1] is not None
+
+
+def test_parse_pool_requires_context_manager():
+    with pytest.raises(RuntimeError):
+        list(ParsePool({}, "x", workers=1).imap([("u", "<html></html>")]))
+
+
+def test_resolve_workers():
+    assert resolve_workers(None) == 0
+    assert resolve_workers(3) == 3
+    assert resolve_workers("auto") >= 1
+
+
+def test_run_with_parse_workers(offline_db, stub_config, recording_scraper):
+    scraper = recording_scraper(stub_config(concurrency=3, parse_workers=2))
+    scraper.run()
+    assert {p["title"] for p in scraper.saved.values()} == {
+        "Sunflower Seed Cookies", "Rice Noodle Stir Fry", "Oat Free Granola Bars",
+    }
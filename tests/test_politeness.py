@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scrapers.politeness import HostScheduler, TokenBucket
+from scrapers.base_scraper import BaseRecipeScraper
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_paces():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+
+
+def test_scheduler_keeps_hosts_independent():
+    clock = FakeClock()
+    sched = HostScheduler(rate=1, burst=1, clock=clock, sleep=clock.sleep)
+    sched.wait("https://a.example/1")
+    sched.wait("https://b.example/1")
+    assert clock.now == 0.0
+    sched.wait("https://a.example/2")
+    assert clock.now == 1.0
+
+    stats = sched.stats()
+    assert stats["a.example"].requests == 2
+    assert stats["a.example"].throttled_waits == 1
+    assert stats["b.example"].throttled_waits == 0
+
+
+def test_retry_after_pauses_the_host():
+    clock = FakeClock()
+    sched = HostScheduler(rate=100, burst=10, clock=clock, sleep=clock.sleep)
+    sched.wait("https://a.example/")
+    sched.record_429("https://a.example/x", 5)
+    sched.wait("https://a.example/y")
+    assert clock.now == 5.0
+    assert sched.stats()["a.example"].status_429 == 1
+
+
+def test_crawl_delay_caps_rate():
+    clock = FakeClock()
+    robots = "User-agent: *\nCrawl-delay: 3\n"
+    sched = HostScheduler(rate=10, burst=5, robots_fetch=lambda url: robots,
+                          clock=clock, sleep=clock.sleep)
+    sched.wait("https://slow.example/a")
+    sched.wait("https://slow.example/b")
+    assert clock.now == 3.0
+
+
+def test_scraper_counts_429_from_stub_site(offline_db, stub_server, stub_config):
+    base_url, server = stub_server
+    scraper = BaseRecipeScraper(stub_config())
+    html = scraper.fetch_page(f"{base_url}/limited/recipe-1.html")
+    assert "Sunflower Seed Cookies" in html
+
+    stats = scraper.log_host_stats()["127.0.0.1"]
+    assert stats.status_429 == 1
+    assert stats.requests == 1
+    assert "/robots.txt" in server.hits
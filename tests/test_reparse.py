@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import gzip
+from pathlib import Path
+
+import pytest
+
+import scrapers.db_writer as db_writer
+from scrapers.base_scraper import BaseRecipeScraper, recipe_digest
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "stub_site"
+
+
+class StreamingConnection:
+    """A connection whose named cursor yields stored raw_recipes rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.named = []
+        self.commits = 0
+
+    def cursor(self, name=None, withhold=False):
+        if name:
+            self.named.append((name, withhold))
+            return iter_cursor(self.rows)
+        return self
+
+    def execute(self, *args, **kwargs):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class iter_cursor(list):
+    itersize = None
+
+    def execute(self, sql, params):
+        self.params = params
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def written(monkeypatch):
+    batches = []
+    monkeypatch.setattr(db_writer, "write_batch",
+                        lambda cur, site, recipes, validators=(), **kw: batches.append(recipes))
+    return batches
+
+
+def test_reparse_streams_raw_html_and_upserts_changed(offline_db, stub_config, written):
+    scraper = BaseRecipeScraper(stub_config(batch_size=2))
+    pages = {n: (FIXTURES / f"recipe-{n}.html").read_text() for n in (1, 2, 3)}
+    current = scraper.parse_recipe(pages[2])
+    conn = StreamingConnection([
+        (11, "http://x/1", pages[1], None, "plain", None, []),
+        # an old clean row left behind by a title change next to the current one
+        (12, "http://x/2", pages[2], None, "plain", None, ["stale", recipe_digest(current)]),
+        (13, "http://x/3", None, gzip.compress(pages[3].encode()), "gzip", None, ["stale"]),
+    ])
+    scraper.db_connection = conn
+    scraper.db_cursor = conn
+
+    scraper.reparse(chunk_size=50)
+
+    assert conn.named == [("reparse_raw_recipes", True)]
+    saved = [r for batch in written for r in batch]
+    assert sorted(r.raw_id for r in saved) == [11, 13]
+    assert {r.parsed["title"] for r in saved} == {"Sunflower Seed Cookies", "Oat Free Granola Bars"}
+    assert scraper.unchanged == 1
@@ -0,0 +1,83 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+
+import scripts.run_pipeline as run_pipeline
+
+
+def test_load_site_configs_skips_non_site_files():
+    configs = run_pipeline.load_site_configs()
+    assert len(configs) == 6
+    assert all(c["start_urls"] for c in configs)
+    assert not any(c.get("incremental") for c in configs)     # opt-in per site
+    assert len(run_pipeline.load_site_configs({"fare"})) == 1
+
+
+def test_sites_run_concurrently_and_failures_are_isolated(monkeypatch):
+    running, peak = [], []
+    lock = threading.Lock()
+
+    def fake_scrape(config, full_crawl=None, time_budget=None):
+        with lock:
+            running.append(config["site_name"])
+            peak.append(len(running))
+        time.sleep(0.2)
+        with lock:
+            running.remove(config["site_name"])
+        if config["site_name"] == "broken":
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(run_pipeline, "scrape_site", fake_scrape)
+    configs = [{"site_name": n} for n in ("a", "broken", "c")]
+    start = time.perf_counter()
+    results = {r.name: r for r in run_pipeline.scrape_all(configs)}
+
+    assert time.perf_counter() - start < 0.5
+    assert max(peak) == 3
+    assert results["a"].ok and results["c"].ok
+    assert not results["broken"].ok and "boom" in results["broken"].error
+
+
+def test_failed_stage_skips_dependent_stages(monkeypatch):
+    calls = []
+
+    def ok_stage(changed_only):
+        calls.append(("clean", changed_only))
+
+    def failing_stage(changed_only):
+        sys.exit("[ERR] model missing")
+
+    def never(changed_only):
+        calls.append("ml")
+
+    monkeypatch.setattr(run_pipeline, "STAGES", [("clean", ok_stage), ("rule", failing_stage), ("ml", never)])
+    results = run_pipeline.run_stages(changed_only=True)
+
+    assert calls == [("clean", True)]
+    assert [r.ok for r in results] == [True, False, False]
+    assert "skipped" in results[2].error
+
+
+def test_reparse_runs_every_site_in_turn_instead_of_scraping(monkeypatch):
+    calls = []
+
+    def fake_reparse(config, workers=None):
+        calls.append((config["site_name"], workers))
+        if config["site_name"] == "broken":
+            raise RuntimeError("bad html")
+
+    def no_scrape(*args, **kwargs):
+        raise AssertionError("--reparse must not scrape")
+
+    monkeypatch.setattr(run_pipeline, "reparse_site", fake_reparse)
+    monkeypatch.setattr(run_pipeline, "scrape_site", no_scrape)
+    monkeypatch.setattr(run_pipeline, "load_site_configs",
+                        lambda only=None: [{"site_name": n} for n in ("a", "broken", "c")])
+
+    ok = run_pipeline.main(stages=False, reparse=True)
+
+    assert not ok
+    assert calls == [("a", None), ("broken", None), ("c", None)]